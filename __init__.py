@@ -9,12 +9,16 @@ For example:
   adk run agent_tool
 
 This keeps a single package entrypoint while allowing multiple agent files.
+
+The selected module is imported lazily: `root_agent` (and `selected_module`)
+are resolved on first attribute access, so importing this package does not
+pull in google.adk / google.genai or construct any Gemini client. Measure the
+cold-start cost with:
+  python -X importtime -c "import <package>" 2> importtime.log
 """
 import importlib
 import importlib.util
-import sys
 import os
-from types import ModuleType
 
 _default = "agent"
 _raw_module = os.environ.get("ADK_AGENT_MODULE", _default)
@@ -35,82 +39,37 @@ def _normalize_module_name(name: str) -> str:
 
 _module_name = _normalize_module_name(_raw_module)
 
-def _import_selected_module(pkg: str, module_name: str) -> ModuleType:
-	# Robust import helper:
-	# 1. Try absolute import of the normalized module name.
-	# 2. If that fails, attempt to locate a .py file under the package directory and import by file path.
-	# 3. As a last resort, try a package-relative import if the package name is usable.
-	name = (module_name or '').lstrip('.')
-
-	# Create a safe package name (module names cannot contain '-') and
-	# ensure we import/load submodules under that namespace. This lets
-	# package-internal relative imports (e.g. "from ..prompts import ...")
-	# resolve correctly even when the containing folder name contains a
-	# hyphen on disk.
-	safe_pkg = (pkg or '').replace('-', '_') or None
-
-	# Try absolute import first (use safe_pkg prefix when available)
-	try:
-		if safe_pkg:
-			return importlib.import_module(f"{safe_pkg}.{name}")
-		return importlib.import_module(name)
-	except Exception:
-		pass
-
-	# Try locating the module under this package's filesystem (supports 'app.agents.foo' or 'app/agents/foo')
-	base_dir = os.path.dirname(__file__)
-	rel_path = name.replace('.', os.sep).replace('/', os.sep)
-	candidates = [
-		os.path.join(base_dir, rel_path + '.py'),
-		os.path.join(base_dir, rel_path, '__init__.py'),
-		os.path.join(base_dir, 'app', rel_path + '.py'),
-		os.path.join(base_dir, 'app', rel_path, '__init__.py'),
-		os.path.join(base_dir, 'app', 'agents', rel_path + '.py'),
-		os.path.join(base_dir, 'app', 'agents', rel_path, '__init__.py'),
-	]
-	for full in candidates:
-		if os.path.exists(full):
-			# Use the safe package namespace as the module's name so that
-			# internal relative imports resolve against it.
-			fq_name = (f"{safe_pkg}.{name}" if safe_pkg else name).replace(os.sep, '.')
-			spec = importlib.util.spec_from_file_location(fq_name, full)
-			if spec and spec.loader:
-				# Ensure the top-level safe package exists in sys.modules and
-				# points to this package directory so import machinery can
-				# find subpackages like 'app' under it.
-				base_dir = os.path.dirname(__file__)
-				if safe_pkg and safe_pkg not in sys.modules:
-					pkg_mod = ModuleType(safe_pkg)
-					pkg_mod.__path__ = [base_dir]
-					pkg_mod.__package__ = safe_pkg
-					sys.modules[safe_pkg] = pkg_mod
-
-				mod = importlib.util.module_from_spec(spec)
-				# Register module in sys.modules under fq_name to support
-				# further imports that may reference it.
-				sys.modules[fq_name] = mod
-				spec.loader.exec_module(mod)
-				return mod
-
-	# Final attempt: package-relative import (only if pkg is a valid package name)
+def _spec_exists(fq_name: str) -> bool:
+	# find_spec only locates the module (parents are imported, the module
+	# itself is not executed), so a missing candidate is cheap to rule out.
 	try:
-		# Package-relative import using safe package namespace
-		if safe_pkg:
-			return importlib.import_module(f".{name}", package=safe_pkg)
-		return importlib.import_module(f".{name}", package=pkg)
-	except Exception as e:
-		raise ImportError(f"Fail to load '{pkg}' module. {e}") from e
+		return importlib.util.find_spec(fq_name) is not None
+	except ModuleNotFoundError:
+		return False
 
-_mod = _import_selected_module(__package__ or "adk-travel-agent", _module_name)
-
-# Expose root_agent for ADK loader
-if hasattr(_mod, "root_agent"):
-	root_agent = getattr(_mod, "root_agent")
-else:
-	# Provide a clearer error when ADK imports the package and root_agent is missing
-	raise ImportError(
-		f"Selected module '{_module_name}' does not define 'root_agent'."
-	)
+def _import_selected_module(module_name: str):
+	# Candidates are resolved against this package's real name (which may
+	# contain '-' on disk), so relative imports inside agent modules work:
+	# 1. '<pkg>.<name>'            e.g. ADK_AGENT_MODULE=app.agents.conversationAgent
+	# 2. '<pkg>.app.agents.<name>' e.g. ADK_AGENT_MODULE=conversationAgent
+	# Errors raised while executing the selected module are NOT swallowed.
+	name = (module_name or '').lstrip('.')
+	for fq_name in (f"{__name__}.{name}", f"{__name__}.app.agents.{name}"):
+		if _spec_exists(fq_name):
+			return importlib.import_module(fq_name)
+	raise ImportError(f"Fail to load '{__name__}' module: '{name}' not found.")
 
-# Also expose the selected module for debugging
-selected_module = _mod
+def __getattr__(attr: str):
+	# PEP 562 lazy attributes; results are cached as real module globals so
+	# this hook only runs once per attribute.
+	if attr not in ("root_agent", "selected_module"):
+		raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+	mod = _import_selected_module(_module_name)
+	if not hasattr(mod, "root_agent"):
+		# Provide a clearer error when ADK imports the package and root_agent is missing
+		raise ImportError(
+			f"Selected module '{_module_name}' does not define 'root_agent'."
+		)
+	# Also expose the selected module for debugging
+	globals().update(root_agent=mod.root_agent, selected_module=mod)
+	return globals()[attr]
@@ -0,0 +1,48 @@
+"""
+Lazy agent registry.
+
+Importing this package is cheap: no agent module (and therefore no
+google.adk / google.genai / requests import, no Gemini client) is loaded
+until an agent is looked up with `get_agent(name)`. Each agent is built
+once, on first use, and cached for the lifetime of the process.
+"""
+
+import importlib
+import threading
+
+# registry name -> submodule (each submodule exposes `root_agent`)
+AGENT_MODULES = {
+    "conversationAgent": "conversationAgent",
+    "plannerAgent": "plannerAgent",
+    "flightAgent": "flightAgent",
+    "hotelAgent": "hotelAgent",
+    "attractionAgent": "attractionAgent",
+    "groupAgent": "groupAgent",
+    "exportAgent": "exportAgent",
+    "profileAgent": "profileAgent",
+}
+
+_agents = {}
+_lock = threading.RLock()
+
+
+def get_agent(name: str):
+    """Return the `root_agent` of a registered agent, building it on first use."""
+    agent = _agents.get(name)
+    if agent is not None:
+        return agent
+    if name not in AGENT_MODULES:
+        raise KeyError(f"Unknown agent '{name}'. Known agents: {', '.join(AGENT_MODULES)}")
+    # RLock: building the planner looks up its sub-agents from the same thread
+    with _lock:
+        agent = _agents.get(name)
+        if agent is None:
+            mod = importlib.import_module(f".{AGENT_MODULES[name]}", package=__name__)
+            agent = getattr(mod, "root_agent")
+            _agents[name] = agent
+    return agent
+
+
+def loaded_agents():
+    """Names of the agents built so far (useful when checking cold-start cost)."""
+    return list(_agents)
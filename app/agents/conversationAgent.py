@@ -11,20 +11,21 @@ Key behavior:
 
 import logging
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
 from google.adk.tools import AgentTool
 
 from ..prompts.prompts import conversationalPrompt
-from .plannerAgent import root_agent as plannerAgent
+from ..modelScheduler import PRIORITY_USER
+from .scheduledGemini import scheduled_gemini
+from . import get_agent
 
 logger = logging.getLogger("conversationAgent")
-print("✅ conversationAgent module loaded")
+logger.debug("conversationAgent module loaded")
 
 conversationAgent = LlmAgent(
     name="conversationAgent",
-    model=Gemini(model="gemini-2.5-flash-lite"),
+    model=scheduled_gemini("gemini-2.5-flash-lite", priority=PRIORITY_USER),
     instruction=conversationalPrompt,
-    tools=[AgentTool(plannerAgent)],
+    tools=[AgentTool(get_agent("plannerAgent"))],
 )
 
 root_agent = conversationAgent
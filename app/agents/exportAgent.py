@@ -1,32 +1,41 @@
 """
-exportAgent — persist itinerary to MCP /tool/persistItinerary
+exportAgent — queue itinerary export on MCP /tool/exportItinerary.
+
+The MCP host acknowledges with a jobId straight away and persists the trip +
+renders PDF/ICS in the background (poll GET /tool/exportStatus/<jobId>), so
+saving no longer adds to the planner's latency.
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import requests
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
 from ..prompts.prompts import exportPrompt
+from .scheduledGemini import scheduled_gemini
 
 logger = logging.getLogger("exportAgent")
 logger.setLevel(logging.INFO)
 
-MCP_PERSIST = "http://localhost:8600/tool/persistItinerary"
+MCP_EXPORT = "http://localhost:8600/tool/exportItinerary"
 
 def persist_itinerary(
     userId: str,
     itinerary: Dict[str, Any],
-    meta: Optional[Dict[str, Any]] = None
+    meta: Optional[Dict[str, Any]] = None,
+    formats: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
-    Flat signature for ADK parsing. Calls MCP persist endpoint.
+    Flat signature for ADK parsing. Queues the MCP export job and returns
+    its acknowledgement ({"status": "accepted", "jobId": ...}). The trip is
+    only saved unless `formats` ("pdf", "ics") asks for documents too.
     """
     print("Calling persist_itinerary...")
     try:
         payload = {"userId": userId, "itinerary": itinerary, "meta": meta or {}}
-        r = requests.post(MCP_PERSIST, json=payload, timeout=8)
+        if formats:
+            payload["formats"] = formats
+        r = requests.post(MCP_EXPORT, json=payload, timeout=8)
         r.raise_for_status()
         return r.json()
     except Exception as e:
@@ -35,7 +44,7 @@ def persist_itinerary(
 
 export_agent = LlmAgent(
     name="exportAgent",
-    model=Gemini(model="gemini-2.5-flash-lite"),
+    model=scheduled_gemini("gemini-2.5-flash-lite"),
     instruction=exportPrompt,
     tools=[persist_itinerary],
 )
@@ -8,8 +8,8 @@ from typing import Optional, Dict, Any
 import requests
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
 from ..prompts.prompts import flightPrompt
+from .scheduledGemini import scheduled_gemini
 
 logger = logging.getLogger("flightAgent")
 logger.setLevel(logging.INFO)
@@ -24,11 +24,13 @@ def search_flights(
     non_stop: bool = True,
     time_window: Optional[str] = None,
     preferred_airline: Optional[str] = None,
-    limit: int = 5
+    limit: Optional[int] = None,
+    user_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Simple flat signature (primitives only) so ADK's function declaration parser can handle it.
     Calls MCP /tool/searchFlights and returns MCP JSON directly (wrap error if request fails).
+    With user_id, MCP ranks flights by that user's preferences and returns a short top list.
     """
     print("Calling search_flights...")
     try:
@@ -39,7 +41,8 @@ def search_flights(
             "nonStop": bool(non_stop),
             "timeWindow": time_window,
             "preferredAirline": preferred_airline,
-            "limit": int(limit),
+            "limit": int(limit) if limit else None,
+            "userId": user_id,
         }
         # remove None values
         payload = {k: v for k, v in payload.items() if v is not None and v != ""}
@@ -53,7 +56,7 @@ def search_flights(
 # LLM Agent — expose the function as a tool by putting the function in `tools` list.
 flight_agent = LlmAgent(
     name="flightAgent",
-    model=Gemini(model="gemini-2.5-flash-lite"),
+    model=scheduled_gemini("gemini-2.5-flash-lite"),
     instruction=flightPrompt,
     tools=[search_flights],
 )
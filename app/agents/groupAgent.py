@@ -0,0 +1,114 @@
+"""
+groupAgent — plans flights + one shared hotel for several travellers in one go.
+
+Exposes a function tool `search_group_trip(...)` for its internal LLM:
+ • loads every member's profile in ONE batch call (/tool/searchUserProfile)
+ • searches flights from each member's home city concurrently
+   (/tool/searchFlights, one request per member, ranked by their preferences)
+ • searches hotels once with the tightest constraints of the group:
+   lowest hotelBudgetPerNight and highest minHotelRating
+so a group trip costs one planner run instead of one per traveller.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from google.adk.agents import LlmAgent
+from ..prompts.prompts import groupPrompt
+from .scheduledGemini import scheduled_gemini
+
+logger = logging.getLogger("groupAgent")
+logger.setLevel(logging.INFO)
+
+MCP_BASE = os.getenv("MCP_HOST_URL", "http://localhost:8600")
+MCP_SEARCH_PROFILE = f"{MCP_BASE}/tool/searchUserProfile"
+MCP_SEARCH_FLIGHTS = f"{MCP_BASE}/tool/searchFlights"
+MCP_SEARCH_HOTELS = f"{MCP_BASE}/tool/searchHotels"
+TIMEOUT = float(os.getenv("MCP_REQUEST_TIMEOUT", "8.0"))
+
+
+def _post(url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    r = requests.post(url, json=payload, timeout=TIMEOUT)
+    r.raise_for_status()
+    return r.json()
+
+
+def search_group_trip(
+    user_ids: List[str],
+    destination: str,
+    date: str,
+    non_stop: bool = True,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Flat signature for ADK parsing. Returns one flight per member (from their
+    home city) and one hotel in `destination` that fits every member.
+    max_price / min_rating override the values derived from the profiles.
+    """
+    print("Calling search_group_trip...")
+    try:
+        profiles = _post(MCP_SEARCH_PROFILE, {"userIds": list(user_ids)})
+        members = profiles.get("results", [])
+        if not members:
+            return {"status": "error", "message": f"No profiles found for {user_ids}"}
+
+        prefs = [m.get("preferences") or {} for m in members]
+        budgets = [float(p["hotelBudgetPerNight"]) for p in prefs if p.get("hotelBudgetPerNight") is not None]
+        ratings = [float(p["minHotelRating"]) for p in prefs if p.get("minHotelRating") is not None]
+        hotel_query = {"city": destination, "limit": 1}
+        mp = max_price if max_price is not None else (min(budgets) if budgets else None)
+        mr = min_rating if min_rating is not None else (max(ratings) if ratings else None)
+        if mp is not None: hotel_query["maxPrice"] = float(mp)
+        if mr is not None: hotel_query["minRating"] = float(mr)
+
+        # one flight search per member (MCP ranks by their preferences), concurrently with the hotel search
+        with ThreadPoolExecutor(max_workers=len(members) + 1) as pool:
+            hotel_f = pool.submit(_post, MCP_SEARCH_HOTELS, hotel_query)
+            flight_f = [
+                pool.submit(_post, MCP_SEARCH_FLIGHTS, {"source": m.get("city", ""), "destination": destination,
+                                                        "date": date, "nonStop": non_stop, "limit": 1,
+                                                        "userId": m.get("userId")})
+                for m in members
+            ]
+            hotels = hotel_f.result()
+
+        # one member's failed search must not sink the hotel and everyone else's flight
+        travellers = []
+        for m, f in zip(members, flight_f):
+            traveller = {"userId": m.get("userId"), "name": m.get("name"), "origin": m.get("city"), "flight": None}
+            try:
+                found = f.result().get("results") or []
+                traveller["flight"] = found[0] if found else None
+            except Exception as e:
+                logger.warning("flight search failed for %s: %s", m.get("userId"), e)
+                traveller["error"] = str(e)
+            travellers.append(traveller)
+        hotel = (hotels.get("results") or [None])[0]
+        resp = {
+            "status": "success",
+            "travellers": travellers,
+            "hotel": hotel,
+            "hotelConstraints": {"maxPrice": hotel_query.get("maxPrice"), "minRating": hotel_query.get("minRating")},
+        }
+        if profiles.get("missing"):
+            resp["missingUsers"] = profiles["missing"]
+        if hotel is None:
+            resp["message"] = f"No hotel in {destination} fits every member's budget and rating"
+        return resp
+    except Exception as e:
+        logger.exception("search_group_trip failed")
+        return {"status": "error", "message": str(e)}
+
+group_agent = LlmAgent(
+    name="groupAgent",
+    model=scheduled_gemini("gemini-2.5-flash-lite"),
+    instruction=groupPrompt,
+    tools=[search_group_trip],
+)
+
+root_agent = group_agent
@@ -8,8 +8,8 @@ from typing import Optional, Dict, Any
 import requests
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
 from ..prompts.prompts import hotelPrompt
+from .scheduledGemini import scheduled_gemini
 
 logger = logging.getLogger("hotelAgent")
 logger.setLevel(logging.INFO)
@@ -20,14 +20,20 @@ def search_hotels(
     city: str,
     max_price: Optional[float] = None,
     min_rating: Optional[float] = None,
-    limit: int = 5
+    limit: Optional[int] = None,
+    user_id: Optional[str] = None
 ) -> Dict[str, Any]:
     print("Calling search_hotels...")
     """
     Flat parameters only. Returns MCP response.
+    With user_id, MCP ranks hotels by that user's budget / rating / past stays.
     """
     try:
-        payload = {"city": (city or "").strip(), "limit": int(limit)}
+        payload = {"city": (city or "").strip()}
+        if limit:
+            payload["limit"] = int(limit)
+        if user_id:
+            payload["userId"] = user_id
         if max_price is not None:
             payload["maxPrice"] = float(max_price)
         if min_rating is not None:
@@ -41,7 +47,7 @@ def search_hotels(
 
 hotel_agent = LlmAgent(
     name="hotelAgent",
-    model=Gemini(model="gemini-2.5-flash-lite"),
+    model=scheduled_gemini("gemini-2.5-flash-lite"),
     instruction=hotelPrompt,
     tools=[search_hotels],
 )
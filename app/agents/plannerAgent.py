@@ -6,6 +6,7 @@ This agent plans trips by orchestrating subordinate agents:
  • hotelAgent   (find hotels)
  • attractionAgent (find attractions / build daily plan)
  • exportAgent  (save itinerary — only when invoked)
+ • groupAgent   (flights per traveller + one shared hotel, for group trips)
 
 The planner does NOT implement business logic manually.
 It takes formatted user-travel requirements and delegates work
@@ -27,36 +28,34 @@ Output returned to caller (e.g. conversationAgent):
 
 import logging
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
 from google.adk.tools import AgentTool
-from google.genai import types
 
 from ..prompts.prompts import plannerPrompt
-from .flightAgent import root_agent as flightAgent
-from .hotelAgent import root_agent as hotelAgent
-from .attractionAgent import root_agent as attractionAgent
-from .exportAgent import root_agent as exportAgent
+from ..streaming import publish_stage
+from ..modelScheduler import PRIORITY_PLANNER
+from .scheduledGemini import scheduled_gemini
+from . import get_agent
 
 logger = logging.getLogger("plannerAgent")
 
-retry_config = types.HttpRetryOptions(
-    attempts=4, exp_base=5, initial_delay=1, http_status_codes=[429,500,503,504]
-)
-
 planner_agent = LlmAgent(
     name="plannerAgent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=scheduled_gemini("gemini-2.5-flash-lite", priority=PRIORITY_PLANNER),
     instruction=plannerPrompt,
     # Planner uses sub-agents as AgentTool (true agents)
+    # (sub-agents come from the lazy registry, so they are shared singletons)
     tools=[
-        AgentTool(flightAgent),
-        AgentTool(hotelAgent),
-        AgentTool(attractionAgent),
-        AgentTool(exportAgent),
+        AgentTool(get_agent("flightAgent")),
+        AgentTool(get_agent("hotelAgent")),
+        AgentTool(get_agent("attractionAgent")),
+        AgentTool(get_agent("exportAgent")),
+        AgentTool(get_agent("groupAgent")),
     ],
+    # forwards each worker result to the active /plan/stream response (no-op otherwise)
+    after_tool_callback=publish_stage,
 )
 
-print("plannerAgent initialized with sub-agents.")
+logger.debug("plannerAgent initialized with sub-agents.")
 
 root_agent = planner_agent
 
@@ -2,7 +2,7 @@
 import os, logging, requests
 from typing import Dict, Any
 from google.adk.agents.llm_agent import Agent
-from ..prompts.prompts import orchestratorInstruction  # reuse for now or define profile-specific prompt
+from .scheduledGemini import scheduled_gemini
 
 logger = logging.getLogger("profileAgent")
 logging.basicConfig(level=logging.INFO)
@@ -31,13 +31,15 @@ def getUserProfile(payload: Dict[str, Any]) -> Dict[str, Any]:
         return {"status":"error","message": str(e)}
 
 profileAgent = Agent(
-    model="gemini-2.5-flash",
+    model=scheduled_gemini("gemini-2.5-flash"),
     name="profileAgent",
     description="Profile & memory agent - fetch user preferences and past trips via MCP.",
     instruction="Profile Agent - fetch user profile and trips using MCP tools.",
     tools=[getUserProfile],
 )
 
+root_agent = profileAgent
+
 if __name__ == "__main__":
     from flask import Flask, request, jsonify
     app = Flask("profileAgentService")
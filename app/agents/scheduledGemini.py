@@ -0,0 +1,34 @@
+"""
+scheduledGemini — Gemini model wrapper that goes through the modelScheduler.
+
+Every agent builds its model with `scheduled_gemini(...)`, so all calls in the
+process share one admission queue (token bucket per model, bounded
+concurrency, priority by agent role) and the same HTTP retry policy for
+429/5xx responses (previously only plannerAgent retried).
+"""
+
+from typing import AsyncGenerator
+
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+
+from ..modelScheduler import get_scheduler, PRIORITY_WORKER
+
+retry_config = types.HttpRetryOptions(
+    attempts=4, exp_base=5, initial_delay=1, http_status_codes=[429,500,503,504]
+)
+
+
+class ScheduledGemini(Gemini):
+    priority: int = PRIORITY_WORKER
+
+    async def generate_content_async(self, llm_request, stream: bool = False) -> AsyncGenerator:
+        # the slot covers the upstream request (retries included) but is released
+        # before the response is yielded; see ModelScheduler.run
+        upstream = super().generate_content_async(llm_request, stream)
+        async for response in get_scheduler().run(self.model, upstream, self.priority, stream):
+            yield response
+
+
+def scheduled_gemini(model: str, priority: int = PRIORITY_WORKER) -> ScheduledGemini:
+    return ScheduledGemini(model=model, priority=priority, retry_options=retry_config)
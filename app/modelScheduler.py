@@ -0,0 +1,222 @@
+"""
+modelScheduler — process-wide admission control for Gemini calls.
+
+Every model call (see agents/scheduledGemini.py) asks for a slot first:
+  • a token-bucket per model caps requests/minute (MODEL_RPM, MODEL_BURST)
+  • at most MODEL_MAX_CONCURRENCY calls are in flight at once
+  • waiters are admitted by priority (user-facing conversation turns first,
+    then the planner, then worker sub-agents), FIFO within a priority
+  • a waiter that is not admitted within its deadline (MODEL_QUEUE_TIMEOUT
+    seconds) fails with AdmissionTimeout instead of piling onto a 429 storm
+
+State is guarded by a threading lock and waiters are woken through their own
+event loop, so one scheduler serves every loop/thread in the process.
+metrics() reports queue depth and wait times. No google imports here.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger("modelScheduler")
+
+PRIORITY_USER = 0     # conversationAgent turns
+PRIORITY_PLANNER = 1  # plannerAgent orchestration
+PRIORITY_WORKER = 2   # flight / hotel / attraction / export / profile agents
+
+
+class AdmissionTimeout(TimeoutError):
+    """Raised when a model call waited longer than its deadline for a slot."""
+
+
+class _TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: float):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self):
+        self.tokens -= 1
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class _Waiter:
+    __slots__ = ("key", "model", "loop", "event")
+
+    def __init__(self, key, model: str, loop: asyncio.AbstractEventLoop):
+        self.key = key  # (priority, seq)
+        self.model = model
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self.event.set)
+
+
+class ModelScheduler:
+    def __init__(self, max_concurrency: int = 4, rpm: float = 30, burst: float = 5, queue_timeout: float = 60.0):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.burst = burst
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._waiters: list = []  # _Waiter, admitted in (priority, seq) order
+        self._seq = itertools.count()
+        self._active = 0
+        self._stats: Dict[str, Any] = {"admitted": 0, "timeouts": 0, "maxQueueDepth": 0}
+        self._waits: deque = deque(maxlen=1000)  # recent wait times (seconds)
+
+    def _bucket(self, model: str) -> _TokenBucket:
+        b = self._buckets.get(model)
+        if b is None:
+            b = self._buckets[model] = _TokenBucket(self.rpm / 60.0, self.burst)
+        return b
+
+    def _next_admissible(self, now: float) -> Optional[_Waiter]:
+        # highest-priority waiter whose model currently has a token; a waiter
+        # blocked only on its own model's bucket does not hold up other models
+        if self._active >= self.max_concurrency:
+            return None
+        for w in sorted(self._waiters):
+            if self._bucket(w.model).available(now):
+                return w
+        return None
+
+    def _wake_next(self):
+        if self._active >= self.max_concurrency or not self._waiters:
+            return
+        # if everyone is waiting on a token, wake the head anyway so it re-arms
+        # its refill timer (its last check may have seen a token someone else took)
+        w = self._next_admissible(time.monotonic()) or min(self._waiters)
+        w.wake()
+
+    async def acquire(self, model: str, priority: int = PRIORITY_WORKER, timeout: Optional[float] = None):
+        start = time.monotonic()
+        deadline = start + (self.queue_timeout if timeout is None else timeout)
+        w = _Waiter((priority, next(self._seq)), model, asyncio.get_running_loop())
+        with self._lock:
+            self._waiters.append(w)
+            self._stats["maxQueueDepth"] = max(self._stats["maxQueueDepth"], len(self._waiters))
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    if self._next_admissible(now) is w:
+                        self._waiters.remove(w)
+                        self._bucket(model).take()
+                        self._active += 1
+                        self._stats["admitted"] += 1
+                        self._waits.append(now - start)
+                        self._wake_next()  # there may be room for one more
+                        return
+                    # blocked on a token: re-check when the bucket refills
+                    retry_in = self._bucket(model).wait_time(now) or None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AdmissionTimeout(f"No model slot for '{model}' within {deadline - start:.1f}s")
+                w.event.clear()
+                try:
+                    await asyncio.wait_for(w.event.wait(), timeout=min(remaining, retry_in or remaining))
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException as e:
+            with self._lock:
+                if w in self._waiters:
+                    self._waiters.remove(w)
+                if isinstance(e, AdmissionTimeout):
+                    self._stats["timeouts"] += 1
+                self._wake_next()
+            raise
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+            self._wake_next()
+
+    @asynccontextmanager
+    async def slot(self, model: str, priority: int = PRIORITY_WORKER, timeout: Optional[float] = None):
+        await self.acquire(model, priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run(self, model: str, responses: AsyncIterator, priority: int = PRIORITY_WORKER,
+                  stream: bool = False, timeout: Optional[float] = None) -> AsyncIterator:
+        """Drive one upstream model call (`responses`) inside a slot and re-yield its responses.
+
+        The slot is released before any complete response is handed on: ADK runs
+        the function calls of a non-partial response (whole sub-agent runs, which
+        need slots of their own) while the caller is suspended on it, so holding
+        the slot there would stack one slot per agent level and starve the workers
+        once a few plans run at once. When streaming, only partial chunks (text
+        deltas, nothing is executed for them) pass through while the slot is held;
+        the first non-partial response and everything after it wait for release.
+        """
+        pending: list = []
+        async with self.slot(model, priority, timeout):
+            async for response in responses:
+                if stream and not pending and getattr(response, "partial", False):
+                    yield response
+                else:
+                    pending.append(response)
+        for response in pending:
+            yield response
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            by_priority: Dict[int, int] = {}
+            for w in self._waiters:
+                by_priority[w.key[0]] = by_priority.get(w.key[0], 0) + 1
+            pct = lambda p: round(waits[min(len(waits) - 1, int(p * len(waits)))], 4) if waits else 0.0
+            return {
+                "queueDepth": len(self._waiters),
+                "queueDepthByPriority": by_priority,
+                "active": self._active,
+                "maxConcurrency": self.max_concurrency,
+                "rpmPerModel": self.rpm,
+                **self._stats,
+                "waitSeconds": {"p50": pct(0.5), "p95": pct(0.95), "max": round(waits[-1], 4) if waits else 0.0},
+            }
+
+
+_scheduler: Optional[ModelScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> ModelScheduler:
+    """Process-wide scheduler, configured from the environment on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ModelScheduler(
+                    max_concurrency=int(os.getenv("MODEL_MAX_CONCURRENCY", "4")),
+                    rpm=float(os.getenv("MODEL_RPM", "30")),
+                    burst=float(os.getenv("MODEL_BURST", "5")),
+                    queue_timeout=float(os.getenv("MODEL_QUEUE_TIMEOUT", "60")),
+                )
+    return _scheduler
@@ -0,0 +1,201 @@
+"""
+streaming — push partial plan results to the user as soon as each stage finishes.
+
+The planner calls its workers through AgentTools, whose inner events never
+reach the outer Runner. Instead, plannerAgent registers `publish_stage` as its
+after_tool_callback: every worker result (flight, hotel, attractions, export)
+is parsed and pushed into the sink of the request that is currently streaming
+(a ContextVar, so concurrent requests never see each other's stages). The
+conversationAgent's final summary is streamed token-by-token (StreamingMode.SSE)
+after that.
+
+HTTP (SSE):
+  uvicorn app.streaming:create_app --factory --port 8700
+  POST /plan/stream  {"message": "...", "userId": "U001", "sessionId": optional}
+
+This module is imported by plannerAgent, so fastapi / google.adk runners are
+only imported inside the functions that need them.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger("streaming")
+
+APP_NAME = "wanderbot"
+
+# sub-agent tool name -> stage name emitted to the client
+STAGES = {
+    "flightAgent": "flight",
+    "hotelAgent": "hotel",
+    "attractionAgent": "attraction",
+    "exportAgent": "saved",
+    "groupAgent": "group",
+}
+
+_stage_sink: ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = ContextVar("stage_sink", default=None)
+_DONE = object()
+_runner = None
+
+
+def _parse_agent_output(resp: Any) -> Any:
+    """Sub-agents answer 'one short sentence + JSON'; return the JSON part if there is one."""
+    if isinstance(resp, dict) and set(resp) == {"result"}:
+        resp = resp["result"]
+    if not isinstance(resp, str):
+        return resp
+    start, end = resp.find("{"), resp.rfind("}")
+    if start != -1 and end > start:
+        try:
+            return json.loads(resp[start:end + 1])
+        except ValueError:
+            pass
+    return {"text": resp.strip()}
+
+
+def publish_stage(tool, args, tool_context, tool_response):
+    """after_tool_callback for plannerAgent: forward worker results to the active stream."""
+    sink = _stage_sink.get()
+    stage = STAGES.get(getattr(tool, "name", ""))
+    if sink is None or stage is None:
+        return None
+    data = _parse_agent_output(tool_response)
+    if stage == "attraction" and isinstance(data, dict) and isinstance(data.get("attractions"), list):
+        # one chunk per attraction so the client can render them as they are listed
+        for i, a in enumerate(data["attractions"], start=1):
+            sink({"type": "stage", "stage": stage, "index": i, "data": a})
+        return None
+    if isinstance(data, dict) and stage in data:
+        data = data[stage]
+    sink({"type": "stage", "stage": stage, "data": data})
+    return None  # keep the original tool response
+
+
+def _get_runner():
+    global _runner
+    if _runner is None:
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+        from .agents import get_agent
+
+        _runner = Runner(
+            agent=get_agent("conversationAgent"),
+            app_name=APP_NAME,
+            session_service=InMemorySessionService(),
+        )
+    return _runner
+
+
+async def stream_plan(message: str, user_id: str, session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Run the conversation → planner pipeline, yielding chunks as they become available.
+
+    Chunk types: "session", "stage" (flight / hotel / group / attraction / saved),
+    "text" (summary tokens), "final" (full summary) and "error".
+    """
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+
+    runner = _get_runner()
+    sessions = runner.session_service
+    session = None
+    if session_id:
+        session = await sessions.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    if session is None:
+        session = await sessions.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id or str(uuid.uuid4()))
+    yield {"type": "session", "sessionId": session.id}
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        streamed = False
+        try:
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+            ):
+                if event.author != runner.agent.name or not event.content or not event.content.parts:
+                    continue
+                text = "".join(p.text or "" for p in event.content.parts if not getattr(p, "thought", False))
+                if not text:
+                    continue
+                if event.partial:
+                    streamed = True
+                    queue.put_nowait({"type": "text", "text": text})
+                elif event.is_final_response():
+                    queue.put_nowait({"type": "final", "text": None if streamed else text})
+        except Exception as e:
+            logger.exception("stream_plan failed")
+            queue.put_nowait({"type": "error", "message": str(e)})
+        finally:
+            queue.put_nowait(_DONE)
+
+    # the task copies the current context, so planner callbacks inside it see this sink
+    token = _stage_sink.set(queue.put_nowait)
+    try:
+        task = asyncio.create_task(pump())
+    finally:
+        _stage_sink.reset(token)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _sse(chunk: Dict[str, Any]) -> str:
+    return f"event: {chunk['type']}\ndata: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+
+def create_app():
+    """FastAPI app exposing the streaming endpoint (fastapi/uvicorn are optional deps)."""
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import StreamingResponse
+
+    api = FastAPI(title="WanderBot streaming")
+
+    @api.get("/health")
+    async def health():
+        return {"status": "ok", "service": "streaming"}
+
+    @api.get("/metrics/models")
+    async def model_metrics():
+        from .modelScheduler import get_scheduler
+
+        return get_scheduler().metrics()
+
+    @api.post("/plan/stream")
+    async def plan_stream(request: Request):
+        payload = await request.json()
+        message = (payload.get("message") or "").strip()
+        if not message:
+            raise HTTPException(status_code=400, detail="Missing message")
+        user_id = str(payload.get("userId") or "anonymous")
+
+        async def body():
+            async for chunk in stream_plan(message, user_id, payload.get("sessionId")):
+                yield _sse(chunk)
+
+        return StreamingResponse(
+            body(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return api
+
+
+if __name__ == "__main__":
+    import os
+    import uvicorn
+
+    uvicorn.run(create_app(), host="0.0.0.0", port=int(os.getenv("STREAM_PORT", "8700")))
@@ -0,0 +1,134 @@
+"""
+cityResolver — map free-form city / airport input to ONE normalized key.
+
+The alias table is precomputed from the inventory (flight codes + city names,
+hotel and attraction cities) plus a few well-known alternate names. Lookup is:
+  1. normalize ("  BLR airport " -> "blr", "Bengaluru" -> "bengaluru")
+  2. exact alias hit (dict lookup)
+  3. typo-tolerant fallback through a trigram index (Dice similarity), only
+     scoring aliases that share at least one trigram with the input
+  4. for what trigrams miss (a swapped or dropped letter in a short name, e.g.
+     "Dehli"): aliases within one edit (Damerau-Levenshtein), looked up by
+     length; ambiguous matches resolve to None
+Both fallbacks only consider aliases with the same first letter as the input:
+a typo rarely changes it, while a different city often differs only there
+("Mangalore" is not "Bangalore", "Raipur" is not "Jaipur"), and sending the
+user another city's flights is worse than "Unknown city". mcpHost echoes the
+resolved key in its responses so a substitution is visible to the agent.
+Results are memoized, so repeated lookups are a single dict hit.
+
+The key is the lowercased canonical city name ("bangalore"); mcpHost builds
+every index (flights by route, hotels/attractions by city) on that key.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+# alternate name -> canonical city as it appears in mock-data
+KNOWN_ALIASES = {
+    "bengaluru": "Bangalore",
+    "bombay": "Mumbai",
+    "madras": "Chennai",
+    "cochin": "Kochi",
+    "ernakulam": "Kochi",
+    "thiruvananthapuram": "Trivandrum",
+    "new delhi": "Delhi",
+    "banaras": "Varanasi",
+    "benares": "Varanasi",
+    "kashi": "Varanasi",
+    "panaji": "Goa",
+    "poona": "Pune",
+}
+
+_NOISE = {"airport", "international", "intl", "city", "domestic", "terminal", "the"}
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+def normalize(value: str) -> str:
+    v = _NON_ALNUM.sub(" ", (value or "").lower())
+    return " ".join(w for w in v.split() if w not in _NOISE)
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Damerau-Levenshtein distance <= 1 (one insert, delete, substitute or adjacent swap)."""
+    if len(a) < len(b): a, b = b, a
+    if len(a) - len(b) > 1: return False
+    i = 0
+    while i < len(b) and a[i] == b[i]: i += 1
+    if len(a) != len(b): return a[i+1:] == b[i:]
+    if i == len(a) or a[i+1:] == b[i+1:]: return True  # equal, or one substitution
+    return i + 1 < len(a) and a[i] == b[i+1] and a[i+1] == b[i] and a[i+2:] == b[i+2:]
+
+def _trigrams(s: str) -> Set[str]:
+    s = f"  {s} "
+    return {s[i:i+3] for i in range(len(s) - 2)}
+
+class CityResolver:
+    # mcpHost snapshots pickle the resolver (memo included): bump this whenever
+    # its attributes or matching rules change so older snapshots are rebuilt
+    FORMAT = 2
+
+    def __init__(self, pairs: Iterable, aliases: Optional[Dict[str,str]] = None, min_score: float = 0.5):
+        """pairs: iterable of (code_or_None, city) found in the inventory."""
+        self.min_score = min_score
+        self.aliases: Dict[str,str] = {}
+        self.codes: Dict[str,str] = {}
+        for code, city in pairs:
+            key = normalize(city)
+            if not key: continue
+            self.aliases[key] = key
+            if code:
+                self.codes[normalize(code)] = key
+        for alt, city in (aliases if aliases is not None else KNOWN_ALIASES).items():
+            key = normalize(city)
+            if key in self.aliases:  # only alias cities we actually have inventory for
+                self.aliases[normalize(alt)] = key
+        self._grams: Dict[str,List[str]] = defaultdict(list)
+        self._gram_count: Dict[str,int] = {}
+        self._by_len: Dict[int,List[str]] = defaultdict(list)
+        for alias in self.aliases:
+            self._by_len[len(alias)].append(alias)
+            g = _trigrams(alias)
+            self._gram_count[alias] = len(g)
+            for t in g:
+                self._grams[t].append(alias)
+        self._memo: Dict[str,Optional[str]] = {}
+
+    @classmethod
+    def from_inventory(cls, flights: List[dict], hotels: List[dict], attractions: List[dict], **kw):
+        pairs = []
+        for f in flights:
+            pairs.append((f.get("source"), f.get("sourceCity", "")))
+            pairs.append((f.get("destination"), f.get("destinationCity", "")))
+        pairs += [(None, h.get("city", "")) for h in hotels]
+        pairs += [(None, a.get("city", "")) for a in attractions]
+        return cls(pairs, **kw)
+
+    def resolve(self, value: str) -> Optional[str]:
+        """Return the normalized city key for a city name / alias / IATA code, or None."""
+        if value in self._memo:
+            return self._memo[value]
+        key = self._resolve(normalize(value))
+        if len(self._memo) < 10000:
+            self._memo[value] = key
+        return key
+
+    def _resolve(self, v: str) -> Optional[str]:
+        if not v: return None
+        if v in self.codes: return self.codes[v]
+        if v in self.aliases: return self.aliases[v]
+        if len(v) <= 3: return None  # too short to guess (unknown airport code)
+        grams = _trigrams(v)
+        shared: Dict[str,int] = defaultdict(int)
+        for t in grams:
+            for alias in self._grams.get(t, ()):
+                shared[alias] += 1
+        best, best_score = None, self.min_score
+        for alias, n in shared.items():
+            if alias[0] != v[0]: continue
+            score = 2.0 * n / (len(grams) + self._gram_count[alias])
+            if score > best_score:
+                best, best_score = alias, score
+        if best: return self.aliases[best]
+        near = {self.aliases[a] for n in (len(v) - 1, len(v), len(v) + 1)
+                for a in self._by_len.get(n, ()) if a[0] == v[0] and _within_one_edit(v, a)}
+        return near.pop() if len(near) == 1 else None
@@ -0,0 +1,181 @@
+"""
+exportJobs — background export pipeline for saved itineraries (used by mcpHost).
+
+submit() validates the payload, registers a job and returns immediately with
+its jobId. A small thread pool then persists the trip through the trip store
+(which group-commits) and hands document rendering (PDF via fpdf2, ICS) to a
+process pool, so neither the save nor the rendering sits on the planner's
+request path. Documents are only rendered when the payload asks for them
+("formats": "pdf" | "ics" | a list); otherwise the job just saves the trip.
+status(jobId) reports progress:
+
+  queued -> persisting -> rendering -> done | error
+
+Job state is kept by the trip store (a jobs table next to the trips with the
+SQLite backend), so with several mcpHost worker processes a status poll can
+land on any of them.
+
+Render workers are always started with "spawn" (not fork, which would copy a
+process already running the store's writer thread and the export threads).
+Spawned workers re-import the parent's __main__ (mcpHost) as __mp_main__, so
+mcpHost opens its store and queue in init() rather than at import time.
+"""
+
+import logging, multiprocessing, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger("exportJobs")
+
+SUPPORTED_FORMATS = ("pdf", "ics")
+
+def _latin1(v: Any) -> str:
+    # fpdf2 core fonts are latin-1 only (e.g. '₹' becomes '?')
+    return str(v).encode("latin-1", "replace").decode("latin-1")
+
+def _describe(d: Dict[str,Any], keys) -> str:
+    return ", ".join(f"{k}: {d[k]}" for k in keys if d.get(k) not in (None, ""))
+
+def _render_pdf(path: Path, userId: str, it: Dict[str,Any]):
+    from fpdf import FPDF  # optional dependency (fpdf2), imported in the worker only
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.cell(0, 10, _latin1(f"Trip itinerary for {userId}"), new_x="LMARGIN", new_y="NEXT")
+
+    def section(title: str, lines: List[str]):
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 9, _latin1(title), new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", "", 10)
+        for line in lines:
+            pdf.multi_cell(0, 6, _latin1(line), new_x="LMARGIN", new_y="NEXT")
+
+    flight = it.get("flight") or {}
+    if flight:
+        section("Flight", [_describe(flight, ("airline", "flightId", "source", "destination",
+                                              "departureDate", "departureTime", "arrivalTime", "price"))])
+    hotel = it.get("hotel") or {}
+    if hotel:
+        section("Hotel", [_describe(hotel, ("name", "city", "rating", "pricePerNight", "roomType"))])
+    days = it.get("attractions") or it.get("days") or []
+    if days:
+        section("Attractions", [_describe(a, ("date", "city", "name")) if isinstance(a, dict) else str(a) for a in days])
+    pdf.output(str(path))
+
+def _ics_dt(date: str, hhmm: Optional[str]) -> Optional[str]:
+    try:
+        d = datetime.strptime(date, "%Y-%m-%d")
+        if hhmm:
+            hh, mm = hhmm.split(":")
+            return d.replace(hour=int(hh), minute=int(mm)).strftime("%Y%m%dT%H%M%S")
+        return d.strftime("%Y%m%d")
+    except Exception:
+        return None
+
+def _ics_text(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _render_ics(path: Path, job_id: str, it: Dict[str,Any]):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    events = []
+
+    def event(uid: str, summary: str, start: Optional[str], end: Optional[str] = None):
+        if not start: return
+        kind = "" if "T" in start else ";VALUE=DATE"
+        lines = ["BEGIN:VEVENT", f"UID:{job_id}-{uid}", f"DTSTAMP:{stamp}",
+                 f"DTSTART{kind}:{start}", f"SUMMARY:{_ics_text(summary)}"]
+        if end: lines.append(f"DTEND{kind}:{end}")
+        events.append("\r\n".join(lines + ["END:VEVENT"]))
+
+    f = it.get("flight") or {}
+    if f.get("departureDate"):
+        event("flight", f"Flight {f.get('airline','')} {f.get('source','')} -> {f.get('destination','')}",
+              _ics_dt(f["departureDate"], f.get("departureTime")),
+              _ics_dt(f.get("arrivalDate") or f["departureDate"], f.get("arrivalTime")))
+    for i, a in enumerate(it.get("attractions") or []):
+        if isinstance(a, dict) and a.get("date"):
+            start = _ics_dt(a["date"], None)
+            end = (datetime.strptime(start, "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d") if start else None
+            event(f"a{i}", f"{a.get('name','Attraction')} ({a.get('city','')})", start, end)
+    body = "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//WanderBot//Itinerary//EN"] + events + ["END:VCALENDAR"])
+    path.write_text(body + "\r\n", encoding="utf-8")
+
+def render_documents(job_id: str, userId: str, itinerary: Dict[str,Any], out_dir: str, formats: List[str]) -> Dict[str,Any]:
+    """Runs in a worker process. Returns {format: path} or {format: {"error": ...}}."""
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+    files: Dict[str,Any] = {}
+    for fmt in formats:
+        path = out / f"{job_id}.{fmt}"
+        try:
+            if fmt == "pdf": _render_pdf(path, userId, itinerary)
+            elif fmt == "ics": _render_ics(path, job_id, itinerary)
+            else: raise ValueError(f"Unsupported format '{fmt}'")
+            files[fmt] = str(path)
+        except Exception as e:
+            files[fmt] = {"error": f"{type(e).__name__}: {e}"}
+    return files
+
+class ExportQueue:
+    def __init__(self, store, out_dir: Path, workers: int = 2, max_jobs: int = 1000):
+        self.store = store
+        self.out_dir = Path(out_dir)
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self._procs: Optional[ProcessPoolExecutor] = None  # created on first render
+
+    def _update(self, job_id: str, **kw):
+        self.store.update_job(job_id, **kw)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._procs is None:
+                self._procs = ProcessPoolExecutor(max_workers=self.workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+            return self._procs
+
+    def submit(self, payload: Dict[str,Any]) -> Dict[str,Any]:
+        if not payload.get("userId") or not payload.get("itinerary"):
+            return {"status":"error","message":"Missing userId or itinerary"}
+        formats = payload.get("formats") or []  # save only, unless documents are asked for
+        if isinstance(formats, str): formats = [formats]
+        formats = [str(f).strip().lower() for f in formats]
+        unknown = [f for f in formats if f not in SUPPORTED_FORMATS]
+        if unknown:
+            return {"status":"error","message":f"Unsupported format(s) {unknown}; expected {list(SUPPORTED_FORMATS)}"}
+        job_id = uuid.uuid4().hex[:12]
+        trip = {"userId": payload["userId"], "itinerary": payload["itinerary"], "meta": payload.get("meta", {})}
+        now = time.time()
+        self.store.put_job({"jobId": job_id, "status": "queued", "userId": trip["userId"],
+                            "formats": formats, "createdAt": now, "updatedAt": now}, keep=self.max_jobs)
+        self._threads.submit(self._run, job_id, trip, formats)
+        return {"status":"accepted","jobId":job_id}
+
+    def _run(self, job_id: str, trip: Dict[str,Any], formats: List[str]):
+        try:
+            self._update(job_id, status="persisting")
+            self.store.save(trip)
+            if not formats:
+                self._update(job_id, status="done", files={})
+                return
+            self._update(job_id, status="rendering")
+            files = self._pool().submit(render_documents, job_id, trip["userId"], trip["itinerary"],
+                                        str(self.out_dir), formats).result()
+            self._update(job_id, status="done", files=files)
+        except Exception as e:
+            logger.exception("export job %s failed", job_id)
+            self._update(job_id, status="error", message=str(e))
+
+    def status(self, job_id: str) -> Dict[str,Any]:
+        job = self.store.get_job(job_id)
+        if job is None:
+            return {"status":"error","message":f"Unknown jobId '{job_id}'"}
+        return {"status":"success","job":job}
+
+    def close(self):
+        self._threads.shutdown(wait=True)
+        if self._procs is not None:
+            self._procs.shutdown(wait=True)
@@ -1,9 +1,14 @@
-import json, logging, os
+import heapq, json, logging, os, sys, threading, time as _clock
+from collections import Counter
 from pathlib import Path
 from typing import Dict, Any
 from flask import Flask, request, jsonify
-from datetime import time
+from datetime import time, date as _date
 from math import radians, cos, sin, asin, sqrt
+from tripStore import open_trip_store
+from cityResolver import CityResolver
+from exportJobs import ExportQueue
+import snapshot
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mcpHost")
@@ -18,11 +23,14 @@ def _load(p: Path):
         d = json.load(f)
         return d if isinstance(d, list) else [d]
 
-FLIGHTS = _load(DATA_DIR / "flights.json")
-HOTELS = _load(DATA_DIR / "hotels.json")
-ATTRACTIONS = _load(DATA_DIR / "attractions.json")
-USERS = _load(DATA_DIR / "users.json")
-TRIPS = _load(DATA_DIR / "trips.json")
+# inventory (FLIGHTS, HOTELS, ATTRACTIONS, USERS) is loaded by _load_inventory() below:
+# from the mmap'ed snapshot when it is fresh, otherwise from these JSON files
+SOURCES = {name: DATA_DIR / f"{name}.json" for name in ("flights", "hotels", "attractions", "users")}
+EXPORT_DIR = Path(os.getenv("EXPORT_DIR", ROOT / "exports"))
+# opened by init(), not at import: export render workers re-import this file as
+# __mp_main__ (spawn) and must not open a second store / queue or load inventory
+TRIP_STORE = None  # sqlite (sharded by userId index) unless TRIP_STORE=json
+EXPORTS = None
 
 def _parse_time(hhmm: str):
     try:
@@ -32,17 +40,18 @@ def _parse_time(hhmm: str):
     except Exception:
         return None
 
+TIME_WINDOWS = {
+    "early_morning": (time(4,0), time(9,0)),
+    "morning": (time(6,0), time(11,0)),
+    "afternoon": (time(12,0), time(16,59)),
+    "evening": (time(17,0), time(21,0)),
+    "night": (time(22,0), time(23,59))
+}
+
 def _is_in_window(hhmm: str, window_name: str):
     t = _parse_time(hhmm)
     if not t: return False
-    windows = {
-        "early_morning": (time(4,0), time(9,0)),
-        "morning": (time(6,0), time(11,0)),
-        "afternoon": (time(12,0), time(16,59)),
-        "evening": (time(17,0), time(21,0)),
-        "night": (time(22,0), time(23,59))
-    }
-    start, end = windows.get(window_name, (None,None))
+    start, end = TIME_WINDOWS.get(window_name, (None,None))
     if not start: return True
     return start <= t <= end
 
@@ -50,47 +59,282 @@ def _load_json_file(name):
     p = DATA_DIR / name
     return _load(p)
 
-def _match_city_or_code(value: str, candidate_codes: list, candidate_cities: list):
-    # helper: normalize and match either IATA code or city name
-    v = (value or "").strip().lower()
-    if not v: return False
-    # direct code match
-    if v in (c.lower() for c in candidate_codes): return True
-    # city name match
-    if v in (c.lower() for c in candidate_cities): return True
-    return False
+def _flight_key(f):
+    price = float(f.get("price",1e9))
+    duration = int(f.get("durationMinutes", 1e9))
+    dep = f.get("departureTime","99:99")
+    return (price, duration, dep)
+
+def _fastest_key(f):
+    price, duration, dep = _flight_key(f)
+    return (duration, price, dep)
+
+FLIGHT_SORTS = {"price": _flight_key, "duration": _fastest_key}
+
+def _hotel_key(h):
+    score = float(h.get("review_score", h.get("rating", 0)))
+    price = float(h.get("pricePerNight", 1e9))
+    return (-score, price)
+
+def _build_indexes():
+    # every index is keyed by the resolver's normalized city key, pre-sorted by
+    # the tool's ranking so searches only filter (order is preserved)
+    global RESOLVER, FLIGHTS_BY_ROUTE, HOTELS_BY_CITY, ATTRACTIONS_BY_CITY, USERS_BY_ID
+    USERS_BY_ID = {str(u.get("userId")): u for u in USERS if u.get("userId")}
+    RESOLVER = CityResolver.from_inventory(FLIGHTS, HOTELS, ATTRACTIONS)
+    FLIGHTS_BY_ROUTE, HOTELS_BY_CITY, ATTRACTIONS_BY_CITY = {}, {}, {}
+    for f in FLIGHTS:
+        k = (RESOLVER.resolve(f.get("sourceCity") or f.get("source","")),
+             RESOLVER.resolve(f.get("destinationCity") or f.get("destination","")), f.get("departureDate"))
+        FLIGHTS_BY_ROUTE.setdefault(k, []).append(f)
+    for h in HOTELS:
+        HOTELS_BY_CITY.setdefault(RESOLVER.resolve(h.get("city","")), []).append(h)
+    for a in ATTRACTIONS:
+        ATTRACTIONS_BY_CITY.setdefault(RESOLVER.resolve(a.get("city","")), []).append(a)
+    for fs in FLIGHTS_BY_ROUTE.values(): fs.sort(key=_flight_key)
+    for hs in HOTELS_BY_CITY.values(): hs.sort(key=_hotel_key)
+
+# Materialized views: ready-made answers for the common query shapes, rebuilt
+# with the indexes. A query is served from a view only when its parameters hit
+# a view key exactly and limit <= VIEW_TOP_N; anything else uses the index.
+VIEW_TOP_N = 10
+DEFAULT_PRICE_BANDS = (2000, 3000, 4000, 5000, 6000, 8000, 10000)
+DEFAULT_RATING_BANDS = (3.5, 4.0, 4.5)
+# defaults plus the users' own budgets / ratings, set by _build_views (or the snapshot)
+HOTEL_PRICE_BANDS = (None, *DEFAULT_PRICE_BANDS)
+HOTEL_RATING_BANDS = (None, *DEFAULT_RATING_BANDS)
+_stats_lock = threading.Lock()
+VIEW_STATS = {"flights": Counter(), "hotels": Counter(), "buildMs": 0.0}
+ROUTE_POPULARITY = Counter()  # (src, dst) -> searches since start
+
+def _hotel_bands():
+    # hotelAgent passes a user's hotelBudgetPerNight / minHotelRating and groupAgent
+    # the tightest of the group's, so those values get views next to the defaults
+    prices, ratings = set(DEFAULT_PRICE_BANDS), set(DEFAULT_RATING_BANDS)
+    for u in USERS:
+        prefs = u.get("preferences") or {}
+        for v, out in ((prefs.get("hotelBudgetPerNight"), prices), (prefs.get("minHotelRating"), ratings)):
+            try: out.add(float(v))
+            except (TypeError, ValueError): pass
+    return (None, *sorted(prices)), (None, *sorted(ratings))
+
+def _build_views():
+    global FLIGHT_VIEWS, HOTEL_VIEWS, HOTEL_PRICE_BANDS, HOTEL_RATING_BANDS
+    started = _clock.perf_counter()
+    fv, hv = {}, {}
+    # flights: cheapest / fastest per (route, date, window, nonStop)
+    for (src, dst, date), fs in FLIGHTS_BY_ROUTE.items():
+        for non_stop in (True, False):
+            base = [f for f in fs if int(f.get("stops", 1))==0] if non_stop else fs
+            for window in (None, *TIME_WINDOWS):
+                rs = [f for f in base if _is_in_window(f.get("departureTime",""), window)] if window else base
+                for sort_by, key in FLIGHT_SORTS.items():
+                    ordered = rs if sort_by == "price" else sorted(rs, key=key)
+                    fv[(src, dst, date, window, non_stop, sort_by)] = {"count": len(rs), "results": ordered[:VIEW_TOP_N]}
+    # hotels: top-N per (city, max price band, min rating band)
+    HOTEL_PRICE_BANDS, HOTEL_RATING_BANDS = _hotel_bands()
+    for city, hs in HOTELS_BY_CITY.items():
+        for mp in HOTEL_PRICE_BANDS:
+            by_price = [h for h in hs if float(h.get("pricePerNight", 1e9)) <= mp] if mp is not None else hs
+            for mr in HOTEL_RATING_BANDS:
+                rs = [h for h in by_price if float(h.get("rating", h.get("review_score",0))) >= mr] if mr is not None else by_price
+                hv[(city, mp, mr)] = {"count": len(rs), "results": rs[:VIEW_TOP_N]}
+    FLIGHT_VIEWS, HOTEL_VIEWS = fv, hv
+    VIEW_STATS["buildMs"] = round((_clock.perf_counter() - started) * 1000, 3)
+    logger.info(f"Built {len(fv)} flight views and {len(hv)} hotel views in {VIEW_STATS['buildMs']} ms")
+
+def _count_view(kind: str, hit: bool):
+    with _stats_lock:
+        VIEW_STATS[kind]["hits" if hit else "misses"] += 1
+
+def _band(value, bands):
+    # payload value -> view band, or a sentinel that never matches a view key
+    if value is None: return None
+    try: v = float(value)
+    except (TypeError, ValueError): return "no-view"
+    return v if v in bands else "no-view"
+
+# anything that changes how indexes/views are built must be listed here, so an
+# older snapshot is rejected instead of serving differently-shaped views
+SNAPSHOT_PARAMS = {"viewTopN": VIEW_TOP_N, "priceBands": DEFAULT_PRICE_BANDS,
+                   "ratingBands": DEFAULT_RATING_BANDS,
+                   "timeWindows": {name: [start.isoformat(), end.isoformat()] for name, (start, end) in TIME_WINDOWS.items()},
+                   "resolverFormat": CityResolver.FORMAT}
+INVENTORY = {"source": None, "loadMs": 0.0}
+
+def _install_snapshot(snap):
+    # every index is an mmap'ed table resolved per lookup: nothing here scales with the inventory
+    global FLIGHTS, HOTELS, ATTRACTIONS, USERS, RESOLVER, USERS_BY_ID
+    global FLIGHTS_BY_ROUTE, HOTELS_BY_CITY, ATTRACTIONS_BY_CITY, FLIGHT_VIEWS, HOTEL_VIEWS
+    global HOTEL_PRICE_BANDS, HOTEL_RATING_BANDS
+    FLIGHTS, HOTELS, ATTRACTIONS, USERS = (snap.records[n] for n in SOURCES)
+    RESOLVER = snap.resolver
+    rows = lambda name: (lambda count, ids: snap.rows(name, ids))
+    view = lambda name: (lambda count, ids: {"count": count, "results": snap.rows(name, ids)})
+    USERS_BY_ID = snap.index("usersById", lambda count, ids: USERS[ids[0]])
+    FLIGHTS_BY_ROUTE = snap.index("flightsByRoute", rows("flights"))
+    HOTELS_BY_CITY = snap.index("hotelsByCity", rows("hotels"))
+    ATTRACTIONS_BY_CITY = snap.index("attractionsByCity", rows("attractions"))
+    FLIGHT_VIEWS = snap.index("flightViews", view("flights"))
+    HOTEL_VIEWS = snap.index("hotelViews", view("hotels"))
+    extra = snap.manifest["extra"]
+    VIEW_STATS["buildMs"] = extra.get("viewBuildMs", 0.0)
+    HOTEL_PRICE_BANDS, HOTEL_RATING_BANDS = tuple(extra["priceBands"]), tuple(extra["ratingBands"])
+
+def _load_inventory(use_snapshot: bool = True):
+    global FLIGHTS, HOTELS, ATTRACTIONS, USERS
+    started = _clock.perf_counter()
+    snap = None
+    if use_snapshot and os.getenv("MCP_SNAPSHOT", "1") != "0":
+        snap = snapshot.load(DATA_DIR, SNAPSHOT_PARAMS)
+    if snap is not None:
+        _install_snapshot(snap)
+    else:
+        FLIGHTS, HOTELS, ATTRACTIONS, USERS = (_load(p) for p in SOURCES.values())
+        _build_indexes()
+        _build_views()
+    INVENTORY.update(source="snapshot" if snap is not None else "json",
+                     loadMs=round((_clock.perf_counter() - started) * 1000, 3))
+    logger.info(f"Inventory loaded from {INVENTORY['source']} in {INVENTORY['loadMs']} ms")
+
+def build_snapshot():
+    """Parse the JSON, build indexes/views and write them as a snapshot (row ids into mmap'ed records)."""
+    _load_inventory(use_snapshot=False)
+    datasets = {"flights": FLIGHTS, "hotels": HOTELS, "attractions": ATTRACTIONS, "users": USERS}
+    pos = {name: {id(r): i for i, r in enumerate(recs)} for name, recs in datasets.items()}
+    rows = lambda name, rs: (len(rs), [pos[name][id(r)] for r in rs])
+    indexes = {
+        "usersById": {uid: rows("users", [u]) for uid, u in USERS_BY_ID.items()},
+        "flightsByRoute": {k: rows("flights", fs) for k, fs in FLIGHTS_BY_ROUTE.items()},
+        "hotelsByCity": {k: rows("hotels", hs) for k, hs in HOTELS_BY_CITY.items()},
+        "attractionsByCity": {k: rows("attractions", at) for k, at in ATTRACTIONS_BY_CITY.items()},
+        "flightViews": {k: (v["count"], rows("flights", v["results"])[1]) for k, v in FLIGHT_VIEWS.items()},
+        "hotelViews": {k: (v["count"], rows("hotels", v["results"])[1]) for k, v in HOTEL_VIEWS.items()},
+    }
+    return snapshot.write(DATA_DIR, datasets, SOURCES, indexes, RESOLVER, SNAPSHOT_PARAMS,
+                          extra={"viewBuildMs": VIEW_STATS["buildMs"], "priceBands": list(HOTEL_PRICE_BANDS),
+                                 "ratingBands": list(HOTEL_RATING_BANDS)})
+
+def reload_data():
+    """Reload the inventory (snapshot if still fresh, else JSON) and rebuild resolver, indexes and views."""
+    _load_inventory()
+    _profile_cache.clear()
+    return {"status":"success","flights":len(FLIGHTS),"hotels":len(HOTELS),"attractions":len(ATTRACTIONS),
+            "source":INVENTORY["source"],"loadMs":INVENTORY["loadMs"],"viewBuildMs":VIEW_STATS["buildMs"]}
+
+def view_stats():
+    with _stats_lock:
+        out = {"inventory": dict(INVENTORY), "buildMs": VIEW_STATS["buildMs"], "flightViews": len(FLIGHT_VIEWS), "hotelViews": len(HOTEL_VIEWS),
+               "hotelBands": {"maxPrice": HOTEL_PRICE_BANDS[1:], "minRating": HOTEL_RATING_BANDS[1:]}}
+        for kind in ("flights", "hotels"):
+            c = VIEW_STATS[kind]; total = c["hits"] + c["misses"]
+            out[kind] = {"hits": c["hits"], "misses": c["misses"], "hitRate": round(c["hits"] / total, 4) if total else 0.0}
+        out["popularRoutes"] = [{"route": f"{a}->{b}", "searches": n} for (a, b), n in ROUTE_POPULARITY.most_common(10)]
+    return out
+
+# Preference-aware ranking: with a userId, flight/hotel/attraction search ranks
+# the (already narrow) index candidates with a per-user score and keeps only the
+# top-k via heapq, instead of handing the planner every match to re-filter.
+PERSONAL_LIMIT = 3
+PROFILE_TTL = 300  # seconds a user's ranking profile (prefs + past trips) stays cached
+_profile_cache: Dict[str,Any] = {}
+
+def _ranking_profile(user_id):
+    if not user_id: return None
+    uid = str(user_id)
+    hit = _profile_cache.get(uid)
+    now = _clock.monotonic()
+    if hit and hit[0] > now: return hit[1]
+    user = USERS_BY_ID.get(uid)
+    if user is None: return None
+    prefs = user.get("preferences") or {}
+    trips = TRIP_STORE.trips_for_user(uid, 20)
+    favourites = {a.strip().lower() for t in trips for a in (t.get("favouriteAttractions") or [])}
+    categories = Counter(a.get("category","").lower() for a in ATTRACTIONS if a.get("name","").strip().lower() in favourites)
+    if prefs.get("attractionCategory"): categories[prefs["attractionCategory"].lower()] += 2
+    # nightly spend on past trips, used when the profile has no hotel budget (~half goes to the hotel)
+    nightly = []
+    for t in trips:
+        try:
+            nights = (_date.fromisoformat(t["endDate"]) - _date.fromisoformat(t["startDate"])).days
+            if nights > 0 and t.get("budget"): nightly.append(float(t["budget"]) / nights)
+        except Exception:
+            continue
+    budget = prefs.get("hotelBudgetPerNight") or (sorted(nightly)[len(nightly)//2] * 0.5 if nightly else None)
+    ctx = {
+        "preferredClass": (prefs.get("preferredClass") or "").lower(),
+        "preferEarly": bool(prefs.get("preferEarlyFlights")),
+        "hotelBudget": float(budget) if budget else None,
+        "minRating": float(prefs["minHotelRating"]) if prefs.get("minHotelRating") is not None else None,
+        "pastHotels": {t.get("hotel","").strip().lower() for t in trips if t.get("hotel")},
+        "categories": categories,
+    }
+    _profile_cache[uid] = (now + PROFILE_TTL, ctx)
+    return ctx
+
+def _flight_scorer(ctx):
+    # lower is better, in price units: fare + time cost + preference penalties
+    def score(f):
+        s = float(f.get("price", 1e9)) + 15 * int(f.get("durationMinutes", 1e4))
+        if ctx["preferredClass"] and f.get("class","").lower() != ctx["preferredClass"]: s += 3000
+        dep = _parse_time(f.get("departureTime",""))
+        if dep is not None:
+            if ctx["preferEarly"] and dep >= time(9,0): s += 2000
+            if not ctx["preferEarly"] and dep < time(6,0): s += 1000
+        return (s, _flight_key(f))
+    return score
+
+def _hotel_scorer(ctx):
+    # lower is better: rating first, soft penalties for going over budget / under the usual rating
+    budget, min_rating = ctx["hotelBudget"], ctx["minRating"]
+    def score(h):
+        rating = float(h.get("rating", h.get("review_score", 0)))
+        price = float(h.get("pricePerNight", 1e9))
+        s = -rating
+        if budget:
+            s += 0.1 * price / budget + 0.5 * max(0.0, price - budget) / budget
+        if min_rating is not None and rating < min_rating: s += 1.0
+        if h.get("name","").strip().lower() in ctx["pastHotels"]: s -= 0.3
+        return (s, _hotel_key(h))
+    return score
 
 def search_flights_tool(payload: Dict[str,Any]):
     try:
         for k in ("source","destination","date"):
             if not payload.get(k): return {"status":"error","message":f"Missing {k}"}
-        src = payload["source"].strip()
-        dst = payload["destination"].strip()
+        src = RESOLVER.resolve(payload["source"])
+        dst = RESOLVER.resolve(payload["destination"])
+        if not src or not dst:
+            unknown = payload["source"] if not src else payload["destination"]
+            return {"status":"success","count":0,"results":[],"message":f"Unknown city or airport '{unknown}'"}
+        # echoed so the agent can tell when a typo / alias was mapped to another spelling
+        resolved = {"resolvedSource": src, "resolvedDestination": dst}
         date = payload["date"]
         non_stop = payload.get("nonStop", True)
         timeWindow = payload.get("timeWindow")
-        limit = int(payload.get("limit", 5))
-        results = []
-        for f in FLIGHTS:
-            codes = [f.get("source",""), f.get("destination","")]
-            cities = [f.get("sourceCity",""), f.get("destinationCity","")]
-            if f.get("departureDate") != date: continue
-            # match both ends: allow either code or city name as input
-            if not (_match_city_or_code(src, [f.get("source","")], [f.get("sourceCity","")]) and
-                    _match_city_or_code(dst, [f.get("destination","")], [f.get("destinationCity","")])):
-                continue
-            results.append(f)
+        profile = _ranking_profile(payload.get("userId"))
+        limit = int(payload.get("limit", PERSONAL_LIMIT if profile else 5))
+        sort_by = payload.get("sortBy") or "price"
+        if sort_by not in FLIGHT_SORTS: return {"status":"error","message":f"Unknown sortBy '{sort_by}'"}
+        with _stats_lock: ROUTE_POPULARITY[(src, dst)] += 1
+        view = None
+        if not profile:  # views are ordered by price/duration, not by a user's score
+            view = FLIGHT_VIEWS.get((src, dst, date, timeWindow or None, bool(non_stop), sort_by)) if limit <= VIEW_TOP_N else None
+            _count_view("flights", view is not None)
+        if view is not None:
+            return {"status":"success","count":view["count"],**resolved,"results":view["results"][:limit]}
+        # route index is already sorted by (price, duration, departure)
+        results = FLIGHTS_BY_ROUTE.get((src, dst, date), [])
         if non_stop:
             results = [f for f in results if int(f.get("stops", 1))==0]
         if timeWindow:
             results = [f for f in results if _is_in_window(f.get("departureTime",""), timeWindow)]
-        def key_fn(f):
-            price = float(f.get("price",1e9))
-            duration = int(f.get("durationMinutes", 1e9))
-            dep = f.get("departureTime","99:99")
-            return (price, duration, dep)
-        results.sort(key=key_fn)
-        return {"status":"success","count":len(results),"results":results[:limit]}
+        if profile:
+            ranked = heapq.nsmallest(limit, results, key=_flight_scorer(profile))
+            return {"status":"success","count":len(results),**resolved,"rankedFor":str(payload["userId"]),"results":ranked}
+        if sort_by != "price":
+            results = sorted(results, key=FLIGHT_SORTS[sort_by])
+        return {"status":"success","count":len(results),**resolved,"results":results[:limit]}
     except Exception as e:
         logger.exception("search_flights_tool")
         return {"status":"error","message":str(e)}
@@ -98,11 +342,22 @@ def search_flights_tool(payload: Dict[str,Any]):
 def search_hotels_tool(payload: Dict[str,Any]):
     try:
         if not payload.get("city"): return {"status":"error","message":"Missing city"}
-        city = payload["city"].strip().lower()
+        city = RESOLVER.resolve(payload["city"])
+        if not city:
+            return {"status":"success","count":0,"results":[],"message":f"Unknown city '{payload['city']}'"}
         maxPrice = payload.get("maxPrice")
         minRating = payload.get("minRating")
-        limit = int(payload.get("limit", 5))
-        hs = [h for h in HOTELS if h.get("city","").strip().lower()==city]
+        profile = _ranking_profile(payload.get("userId"))
+        limit = int(payload.get("limit", PERSONAL_LIMIT if profile else 5))
+        view = None
+        if not profile:
+            view_key = (city, _band(maxPrice, HOTEL_PRICE_BANDS), _band(minRating, HOTEL_RATING_BANDS))
+            view = HOTEL_VIEWS.get(view_key) if limit <= VIEW_TOP_N else None
+            _count_view("hotels", view is not None)
+        if view is not None:
+            return {"status":"success","count":view["count"],"resolvedCity":city,"results":view["results"][:limit]}
+        # city index is already sorted by (-rating, price)
+        hs = HOTELS_BY_CITY.get(city, [])
         if maxPrice is not None:
             try: mp = float(maxPrice); hs = [h for h in hs if float(h.get("pricePerNight", 1e9)) <= mp]
             except: pass
@@ -111,30 +366,104 @@ def search_hotels_tool(payload: Dict[str,Any]):
             except: mr = None
             if mr is not None:
                 hs = [h for h in hs if float(h.get("rating", h.get("review_score",0))) >= mr]
-        def hotel_key(h):
-            score = float(h.get("review_score", h.get("rating", 0)))
-            price = float(h.get("pricePerNight", 1e9))
-            return (-score, price)
-        hs.sort(key=hotel_key)
-        return {"status":"success","count":len(hs),"results":hs[:limit]}
+        if profile:
+            ranked = heapq.nsmallest(limit, hs, key=_hotel_scorer(profile))
+            return {"status":"success","count":len(hs),"resolvedCity":city,"rankedFor":str(payload["userId"]),"results":ranked}
+        return {"status":"success","count":len(hs),"resolvedCity":city,"results":hs[:limit]}
     except Exception as e:
         logger.exception("search_hotels_tool")
         return {"status":"error","message":str(e)}
 
+def search_attractions_tool(payload: Dict[str,Any]):
+    try:
+        if not payload.get("city"): return {"status":"error","message":"Missing city"}
+        city = RESOLVER.resolve(payload["city"])
+        if not city:
+            return {"status":"success","count":0,"results":[],"message":f"Unknown city '{payload['city']}'"}
+        category = (payload.get("category") or "").strip().lower()
+        profile = _ranking_profile(payload.get("userId"))
+        limit = int(payload.get("limit", PERSONAL_LIMIT if profile else 10))
+        at = ATTRACTIONS_BY_CITY.get(city, [])
+        if category:
+            at = [a for a in at if a.get("category","").strip().lower()==category]
+        if profile:
+            # categories of the user's favourite attractions (plus attractionCategory) first
+            cats = profile["categories"]
+            ranked = heapq.nsmallest(limit, enumerate(at), key=lambda ia: (-cats.get(ia[1].get("category","").lower(), 0), ia[0]))
+            return {"status":"success","count":len(at),"resolvedCity":city,"rankedFor":str(payload["userId"]),"results":[a for _, a in ranked]}
+        return {"status":"success","count":len(at),"resolvedCity":city,"results":at[:limit]}
+    except Exception as e:
+        logger.exception("search_attractions_tool")
+        return {"status":"error","message":str(e)}
+
 def persist_itinerary_tool(payload: Dict[str,Any]):
     try:
         if not payload.get("userId") or not payload.get("itinerary"):
             return {"status":"error","message":"Missing userId or itinerary"}
         new_trip = {"userId": payload["userId"], "itinerary": payload["itinerary"], "meta": payload.get("meta", {})}
-        TRIPS.append(new_trip)
-        with open(DATA_DIR / "trips.json", "w", encoding="utf-8") as fh:
-            json.dump(TRIPS, fh, indent=2, ensure_ascii=False)
-            
+        TRIP_STORE.save(new_trip)
         return {"status":"success","message":"itinerary persisted","trip": new_trip}
     except Exception as e:
         logger.exception("persist_itinerary_tool")
         return {"status":"error","message":str(e)}
 
+def export_itinerary_tool(payload: Dict[str,Any]):
+    # acknowledges right away; persisting + PDF/ICS rendering run in the background
+    try:
+        return EXPORTS.submit(payload)
+    except Exception as e:
+        logger.exception("export_itinerary_tool")
+        return {"status":"error","message":str(e)}
+
+def export_status_tool(job_id: str):
+    try:
+        return EXPORTS.status(job_id)
+    except Exception as e:
+        logger.exception("export_status_tool")
+        return {"status":"error","message":str(e)}
+
+def search_user_profile_tool(payload: Dict[str,Any]):
+    # single lookup by userId / email, or a batch with userIds (group trips)
+    try:
+        ids = payload.get("userIds") or ([payload["userId"]] if payload.get("userId") else [])
+        email = (payload.get("email") or "").strip().lower()
+        if not ids and not email: return {"status":"error","message":"Missing userId, userIds or email"}
+        if ids:
+            found = [USERS_BY_ID[str(i)] for i in ids if str(i) in USERS_BY_ID]
+            missing = [str(i) for i in ids if str(i) not in USERS_BY_ID]
+        else:
+            found = [u for u in USERS if (u.get("email") or "").strip().lower() == email]
+            missing = [] if found else [email]
+        resp = {"status":"success","count":len(found),"results":found}
+        if missing: resp["missing"] = missing
+        return resp
+    except Exception as e:
+        logger.exception("search_user_profile_tool")
+        return {"status":"error","message":str(e)}
+
+def search_trips_tool(payload: Dict[str,Any]):
+    try:
+        if not payload.get("userId"): return {"status":"error","message":"Missing userId"}
+        limit = payload.get("limit")
+        ts = TRIP_STORE.trips_for_user(str(payload["userId"]), int(limit) if limit else None)
+        return {"status":"success","count":len(ts),"results":ts}
+    except Exception as e:
+        logger.exception("search_trips_tool")
+        return {"status":"error","message":str(e)}
+
+def init():
+    """Open the trip store, start the export queue and load the inventory (once per process)."""
+    global TRIP_STORE, EXPORTS
+    if TRIP_STORE is None:
+        TRIP_STORE = open_trip_store(DATA_DIR)
+        EXPORTS = ExportQueue(TRIP_STORE, EXPORT_DIR, workers=int(os.getenv("EXPORT_WORKERS", "2")))
+        _load_inventory()
+
+def create_app():
+    """App factory for WSGI servers, e.g. gunicorn "mcpHost:create_app()"."""
+    init()
+    return app
+
 from flask import Flask, request, jsonify
 app = Flask("mcpHost")
 
@@ -143,6 +472,15 @@ def health():
     print("Health check performed")
     return jsonify({"status":"ok","service":"mcpHost"})
 
+@app.get("/stats/views")
+def http_view_stats():
+    return jsonify(view_stats())
+
+@app.post("/admin/reload")
+def http_reload():
+    print("Reloading inventory...")
+    return jsonify(reload_data())
+
 @app.post("/tool/searchFlights")
 def http_search_flights():
     print("Calling search_flights_tool...")
@@ -153,12 +491,39 @@ def http_search_hotels():
     print("Calling search_hotels_tool...")
     return jsonify(search_hotels_tool(request.get_json(force=True, silent=True) or {}))
 
+@app.post("/tool/searchAttractions")
+def http_search_attractions():
+    print("Calling search_attractions_tool...")
+    return jsonify(search_attractions_tool(request.get_json(force=True, silent=True) or {}))
+
 @app.post("/tool/persistItinerary")
 def http_persist_itinerary():
     print("Calling persist_itinerary_tool...")
     return jsonify(persist_itinerary_tool(request.get_json(force=True, silent=True) or {}))
 
+@app.post("/tool/exportItinerary")
+def http_export_itinerary():
+    print("Calling export_itinerary_tool...")
+    return jsonify(export_itinerary_tool(request.get_json(force=True, silent=True) or {}))
+
+@app.get("/tool/exportStatus/<job_id>")
+def http_export_status(job_id):
+    return jsonify(export_status_tool(job_id))
+
+@app.post("/tool/searchUserProfile")
+def http_search_user_profile():
+    print("Calling search_user_profile_tool...")
+    return jsonify(search_user_profile_tool(request.get_json(force=True, silent=True) or {}))
+
+@app.post("/tool/searchTrips")
+def http_search_trips():
+    print("Calling search_trips_tool...")
+    return jsonify(search_trips_tool(request.get_json(force=True, silent=True) or {}))
+
 if __name__ == "__main__":
+    if "--build-snapshot" in sys.argv:
+        logger.info(f"Snapshot written to {build_snapshot()}")
+        sys.exit(0)
     port = int(os.getenv("MCP_PORT", "8600"))
     logger.info(f"Starting MCP host on port {port}")
-    app.run(host="0.0.0.0", port=port)
+    create_app().run(host="0.0.0.0", port=port)
@@ -0,0 +1,244 @@
+"""
+snapshot — compiled, memory-mappable copy of the mcpHost inventory.
+
+Build it with `python mcpHost.py --build-snapshot` (indexes are built by mcpHost
+itself, so there is one source of truth). Layout of mock-data/snapshot/:
+
+  manifest.json    format version, mcpHost index params, and size / mtime /
+                   sha256 of every source JSON file it was built from
+  <dataset>.rec    records as concatenated UTF-8 JSON
+  <dataset>.off    uint64 offsets (n+1) into the .rec file
+  <index>.hash     sorted uint64 hashes of the index keys (binary-searched)
+  <index>.dir      per entry (n+1, in hash order): uint64 key offset, row-id
+                   offset and match count
+  <index>.keys     the encoded keys (checked on lookup, decoded only to iterate)
+  <index>.ids      uint32 row ids of every entry, back to back
+  resolver.pkl     the city resolver (sized by the number of cities)
+
+At startup every file is mmap'ed read-only (so worker processes share the same
+page-cache pages) and nothing is parsed: an index lookup is a binary search
+over .hash, and a record is only decoded when a query touches it. Cold start is
+therefore near-constant regardless of inventory size. A missing, stale (source
+changed) or incompatible (version / params) snapshot returns None and mcpHost
+falls back to parsing the JSON. resolver.pkl is a local build artifact — only
+load snapshots you built yourself.
+"""
+
+import bisect, hashlib, json, logging, mmap, pickle, shutil
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger("snapshot")
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_DIRNAME = "snapshot"
+
+def _sha256(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _source_info(p: Path) -> Dict[str,Any]:
+    st = p.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _sha256(p)}
+
+def _map(p: Path):
+    with p.open("rb") as f:
+        if p.stat().st_size == 0: return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class MmapRecords(Sequence):
+    """Read-only list of records backed by mmap'ed .rec/.off files; decodes on access."""
+
+    def __init__(self, rec_path: Path, off_path: Path):
+        self._rec = _map(rec_path)
+        self._off = memoryview(_map(off_path)).cast("Q")
+        self._n = len(self._off) - 1
+        self._cache: Dict[int,Any] = {}
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._n))]
+        if i < 0: i += self._n
+        if not 0 <= i < self._n: raise IndexError(i)
+        r = self._cache.get(i)
+        if r is None:
+            r = self._cache[i] = json.loads(self._rec[self._off[i]:self._off[i+1]])
+        return r
+
+class RowList(Sequence):
+    """An index entry: row ids into an MmapRecords, materialized lazily."""
+
+    def __init__(self, records: MmapRecords, ids):
+        self.records = records
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.records[j] for j in self.ids[i]]
+        return self.records[self.ids[i]]
+
+def _encode_key(key) -> bytes:
+    # canonical bytes for an index key; integral floats are written as ints so
+    # 2000 and 2000.0 find the same entry, as they do in a dict
+    norm = lambda v: int(v) if isinstance(v, float) and v.is_integer() else v
+    if isinstance(key, tuple):
+        key = [norm(v) for v in key]
+    return json.dumps(norm(key), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _key_hash(b: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(b, digest_size=8).digest(), "little")
+
+class MmapIndex(Mapping):
+    """key -> value index over mmap'ed .hash/.dir/.keys/.ids files, resolved per lookup.
+
+    `value(count, ids)` builds what a lookup returns from the entry's match count
+    and its row ids (a memoryview, nothing is copied).
+    """
+
+    def __init__(self, path: Path, name: str, value: Callable[[int,Any],Any]):
+        self._hash = memoryview(_map(path / f"{name}.hash")).cast("Q")
+        self._dir = memoryview(_map(path / f"{name}.dir")).cast("Q")
+        self._keys = _map(path / f"{name}.keys")
+        self._ids = memoryview(_map(path / f"{name}.ids")).cast("I")
+        self._value = value
+
+    def _entry(self, key) -> Optional[int]:
+        try:
+            b = _encode_key(key)
+        except TypeError:
+            return None
+        h = _key_hash(b)
+        i = bisect.bisect_left(self._hash, h)
+        d = self._dir
+        while i < len(self._hash) and self._hash[i] == h:
+            if self._keys[d[3*i]:d[3*i+3]] == b:
+                return i
+            i += 1
+        return None
+
+    def __getitem__(self, key):
+        i = self._entry(key)
+        if i is None: raise KeyError(key)
+        d = self._dir
+        return self._value(d[3*i+2], self._ids[d[3*i+1]:d[3*i+4]])
+
+    def __contains__(self, key):
+        return self._entry(key) is not None
+
+    def __iter__(self):
+        d = self._dir
+        for i in range(len(self)):
+            k = json.loads(self._keys[d[3*i]:d[3*i+3]])
+            yield tuple(k) if isinstance(k, list) else k
+
+    def __len__(self):
+        return len(self._hash)
+
+class Snapshot:
+    def __init__(self, path: Path, manifest: Dict[str,Any], records: Dict[str,MmapRecords], resolver: Any):
+        self.path = path
+        self.manifest = manifest
+        self.records = records
+        self.resolver = resolver
+
+    def index(self, name: str, value: Callable[[int,Any],Any]) -> MmapIndex:
+        return MmapIndex(self.path, name, value)
+
+    def rows(self, dataset: str, ids) -> RowList:
+        return RowList(self.records[dataset], ids)
+
+def _write_index(path: Path, name: str, entries: Dict[Any,Tuple[int,List[int]]]):
+    encoded = sorted(((_key_hash(b), b, count, ids) for b, (count, ids) in
+                      ((_encode_key(k), v) for k, v in entries.items())), key=lambda e: e[0])
+    hashes, directory, ids_out = array("Q"), array("Q"), array("I")
+    key_pos = 0
+    with (path / f"{name}.keys").open("wb") as fh:
+        for h, b, count, ids in encoded:
+            hashes.append(h)
+            directory.extend((key_pos, len(ids_out), count))
+            fh.write(b); key_pos += len(b)
+            ids_out.extend(ids)
+    directory.extend((key_pos, len(ids_out), 0))
+    for ext, arr in (("hash", hashes), ("dir", directory), ("ids", ids_out)):
+        with (path / f"{name}.{ext}").open("wb") as fh:
+            arr.tofile(fh)
+
+def write(data_dir: Path, datasets: Dict[str,List[dict]], sources: Dict[str,Path],
+          indexes: Dict[str,Dict[Any,Tuple[int,List[int]]]], resolver: Any, params: Dict[str,Any],
+          extra: Optional[Dict[str,Any]] = None) -> Path:
+    """Write a snapshot next to the sources; replaces any previous one atomically (directory swap).
+
+    indexes: name -> {key: (match count, row ids)}; extra is stored in the manifest.
+    """
+    final = Path(data_dir) / SNAPSHOT_DIRNAME
+    tmp = Path(data_dir) / (SNAPSHOT_DIRNAME + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    counts = {}
+    for name, recs in datasets.items():
+        offsets, pos = array("Q", [0]), 0
+        with (tmp / f"{name}.rec").open("wb") as fh:
+            for r in recs:
+                b = json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                fh.write(b); pos += len(b); offsets.append(pos)
+        with (tmp / f"{name}.off").open("wb") as fh:
+            offsets.tofile(fh)
+        counts[name] = len(recs)
+    for name, entries in indexes.items():
+        _write_index(tmp, name, entries)
+    with (tmp / "resolver.pkl").open("wb") as fh:
+        pickle.dump(resolver, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "params": params,
+        "counts": counts,
+        "indexes": sorted(indexes),
+        "extra": extra or {},
+        "sources": {name: {"file": p.name, **_source_info(p)} for name, p in sources.items() if p.exists()},
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    shutil.rmtree(final, ignore_errors=True)
+    tmp.rename(final)
+    return final
+
+def _is_fresh(data_dir: Path, sources: Dict[str,Any]) -> bool:
+    for name, info in sources.items():
+        p = Path(data_dir) / info["file"]
+        if not p.exists(): return False
+        st = p.stat()
+        if st.st_size == info["size"] and st.st_mtime_ns == info["mtime_ns"]:
+            continue  # fast path: untouched file, no hashing
+        if st.st_size != info["size"] or _sha256(p) != info["sha256"]:
+            logger.info(f"Snapshot is stale: {info['file']} changed")
+            return False
+    return True
+
+def load(data_dir: Path, params: Dict[str,Any]) -> Optional[Snapshot]:
+    path = Path(data_dir) / SNAPSHOT_DIRNAME
+    mf = path / "manifest.json"
+    if not mf.exists(): return None
+    try:
+        manifest = json.loads(mf.read_text(encoding="utf-8"))
+        if manifest.get("version") != SNAPSHOT_VERSION or manifest.get("params") != json.loads(json.dumps(params)):
+            logger.info("Snapshot ignored: built by a different format version or index params")
+            return None
+        if not _is_fresh(data_dir, manifest.get("sources", {})):
+            return None
+        records = {name: MmapRecords(path / f"{name}.rec", path / f"{name}.off") for name in manifest["counts"]}
+        with (path / "resolver.pkl").open("rb") as fh:
+            resolver = pickle.load(fh)
+        return Snapshot(path, manifest, records, resolver)
+    except Exception:
+        logger.exception("Snapshot load failed; falling back to JSON")
+        return None
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the repo root is not an installable package; make `app`, `cityResolver`, ... importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,47 @@
+import pytest
+
+from cityResolver import CityResolver, normalize
+
+PAIRS = [("DEL", "Delhi"), ("BLR", "Bangalore"), ("BOM", "Mumbai"), ("GOI", "Goa"),
+         ("MAA", "Chennai"), (None, "Pune"), (None, "Jaipur"), (None, "Kochi")]
+
+
+@pytest.fixture
+def resolver():
+    return CityResolver(PAIRS)
+
+
+@pytest.mark.parametrize("value, key", [
+    ("Delhi", "delhi"),
+    ("  DEL ", "delhi"),
+    ("BLR airport", "bangalore"),
+    ("Bengaluru", "bangalore"),
+    ("New Delhi", "delhi"),
+    ("Banglore", "bangalore"),    # trigram fallback
+    ("Dehli", "delhi"),           # adjacent swap
+    ("Mumabi", "mumbai"),
+    ("Jiapur", "jaipur"),
+    ("Chenai", "chennai"),        # dropped letter
+    ("Punee", "pune"),            # extra letter
+])
+def test_resolves_names_codes_aliases_and_typos(resolver, value, key):
+    assert resolver.resolve(value) == key
+
+
+@pytest.mark.parametrize("value", ["", "XYZ", "Atlantis", "Dlhii"])
+def test_unknown_input_resolves_to_none(resolver, value):
+    assert resolver.resolve(value) is None
+
+
+@pytest.mark.parametrize("value", ["Mangalore", "Raipur", "Nagpur", "Bune"])
+def test_other_real_cities_are_not_mapped_onto_inventory_cities(resolver, value):
+    assert resolver.resolve(value) is None
+
+
+def test_ambiguous_single_edit_resolves_to_none():
+    r = CityResolver([(None, "Agra"), (None, "Arag")])
+    assert r.resolve("Arga") is None
+
+
+def test_normalize_drops_noise_words():
+    assert normalize("  BLR International Airport ") == "blr"
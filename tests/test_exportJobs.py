@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from exportJobs import ExportQueue
+from tripStore import JsonTripStore, SqliteTripStore
+
+ITINERARY = {"flight": {"departureDate": "2025-02-12", "departureTime": "06:00", "arrivalTime": "08:30"}}
+
+
+def _wait(queue, job_id, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.status(job_id)["job"]
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    s = SqliteTripStore(tmp_path / "trips.db")
+    yield s
+    s.close()
+
+
+def test_saves_without_rendering_unless_formats_are_given(sqlite_store, tmp_path):
+    q = ExportQueue(sqlite_store, tmp_path / "exports")
+    try:
+        job = _wait(q, q.submit({"userId": "U001", "itinerary": ITINERARY})["jobId"])
+        assert job["status"] == "done" and job["files"] == {} and job["formats"] == []
+        assert len(sqlite_store.trips_for_user("U001")) == 1
+        assert not (tmp_path / "exports").exists()
+    finally:
+        q.close()
+
+
+def test_single_format_string_and_unknown_formats(sqlite_store, tmp_path):
+    q = ExportQueue(sqlite_store, tmp_path / "exports")
+    try:
+        assert q.submit({"userId": "U001", "itinerary": ITINERARY, "formats": ["pdf", "docx"]})["status"] == "error"
+        job = _wait(q, q.submit({"userId": "U001", "itinerary": ITINERARY, "formats": "ICS"})["jobId"])
+        assert job["formats"] == ["ics"] and set(job["files"]) == {"ics"}
+    finally:
+        q.close()
+
+
+def test_job_status_is_visible_from_another_store_on_the_same_db(sqlite_store, tmp_path):
+    # what a second mcpHost worker process sees
+    q = ExportQueue(sqlite_store, tmp_path / "exports")
+    other = SqliteTripStore(tmp_path / "trips.db")
+    q2 = ExportQueue(other, tmp_path / "exports")
+    try:
+        job_id = q.submit({"userId": "U001", "itinerary": ITINERARY})["jobId"]
+        _wait(q, job_id)
+        seen = q2.status(job_id)
+        assert seen["status"] == "success" and seen["job"]["status"] == "done"
+    finally:
+        q.close(); q2.close()
+        other.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_old_jobs_are_evicted(backend, tmp_path):
+    store = SqliteTripStore(tmp_path / "trips.db") if backend == "sqlite" else JsonTripStore(tmp_path / "trips.json")
+    try:
+        for i in range(5):
+            store.put_job({"jobId": f"j{i}", "status": "queued"}, keep=3)
+        assert [store.get_job(f"j{i}") is not None for i in range(5)] == [False, False, True, True, True]
+    finally:
+        store.close()
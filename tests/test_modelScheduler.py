@@ -0,0 +1,96 @@
+import asyncio
+
+from app.modelScheduler import (ModelScheduler, PRIORITY_PLANNER, PRIORITY_USER, PRIORITY_WORKER)
+
+MODEL = "gemini-test"
+
+
+async def _upstream(sched, peak, chunks=1):
+    # stands in for one Gemini request: occupies a slot for a moment
+    peak[0] = max(peak[0], sched.metrics()["active"])
+    for i in range(chunks):
+        await asyncio.sleep(0.01)
+        yield i
+
+
+async def _agent(sched, peak, priority, children=()):
+    # like ADK's flow: the function calls of a response (sub-agent runs) execute
+    # while the model generator is suspended on that response
+    async for _ in sched.run(MODEL, _upstream(sched, peak), priority):
+        await asyncio.gather(*(child() for child in children))
+
+
+async def _plan(sched, peak):
+    workers = [lambda: _agent(sched, peak, PRIORITY_WORKER) for _ in range(3)]
+    planner = lambda: _agent(sched, peak, PRIORITY_PLANNER, workers)
+    await _agent(sched, peak, PRIORITY_USER, [planner])
+
+
+def test_nested_agent_calls_do_not_stack_slots():
+    sched = ModelScheduler(max_concurrency=4, rpm=6000, burst=100, queue_timeout=2.0)
+    peak = [0]
+
+    async def main():
+        await asyncio.gather(*(_plan(sched, peak) for _ in range(4)))
+
+    asyncio.run(main())
+    m = sched.metrics()
+    assert m["timeouts"] == 0
+    assert m["admitted"] == 4 * 5
+    assert m["active"] == 0
+    assert peak[0] <= 4
+
+
+def test_slot_released_before_final_response_is_handled():
+    sched = ModelScheduler(max_concurrency=1, rpm=6000, burst=100, queue_timeout=1.0)
+    peak = [0]
+
+    async def main():
+        async for _ in sched.run(MODEL, _upstream(sched, peak), PRIORITY_USER):
+            # a nested call while handling the response must get the only slot
+            await _agent(sched, peak, PRIORITY_WORKER)
+
+    asyncio.run(main())
+    assert sched.metrics()["timeouts"] == 0
+
+
+class _Chunk:
+    def __init__(self, name, partial):
+        self.name = name
+        self.partial = partial
+
+
+async def _stream(chunks):
+    for c in chunks:
+        await asyncio.sleep(0.01)
+        yield c
+
+
+def test_streamed_chunks_pass_through_in_order():
+    sched = ModelScheduler(max_concurrency=1, rpm=6000, burst=100, queue_timeout=1.0)
+    chunks = [_Chunk("t1", True), _Chunk("t2", True), _Chunk("final", False)]
+
+    async def main():
+        return [c.name async for c in sched.run(MODEL, _stream(chunks), stream=True)]
+
+    assert asyncio.run(main()) == ["t1", "t2", "final"]
+    assert sched.metrics()["active"] == 0
+
+
+def test_streamed_function_call_is_handled_after_release():
+    # ADK yields function-call chunks as non-partial responses, possibly followed
+    # by more upstream chunks; running the call must not hold the caller's slot
+    sched = ModelScheduler(max_concurrency=1, rpm=6000, burst=100, queue_timeout=1.0)
+    peak = [0]
+    chunks = [_Chunk("t1", True), _Chunk("call", False), _Chunk("t2", True), _Chunk("final", False)]
+    seen = []
+
+    async def main():
+        async for c in sched.run(MODEL, _stream(chunks), PRIORITY_USER, stream=True):
+            seen.append((c.name, sched.metrics()["active"]))
+            if c.name == "call":
+                await _agent(sched, peak, PRIORITY_WORKER)
+
+    asyncio.run(main())
+    assert sched.metrics()["timeouts"] == 0
+    assert seen == [("t1", 1), ("call", 0), ("t2", 0), ("final", 0)]
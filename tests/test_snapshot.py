@@ -0,0 +1,111 @@
+import json
+import random
+import shutil
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask")  # mcpHost serves its tools through flask
+import mcpHost  # noqa: E402
+import snapshot  # noqa: E402
+from tripStore import JsonTripStore  # noqa: E402
+
+MOCK_DATA = Path(__file__).resolve().parents[1] / "mock-data"
+
+
+@pytest.fixture
+def host(tmp_path, monkeypatch):
+    for f in MOCK_DATA.glob("*.json"):
+        shutil.copy(f, tmp_path / f.name)
+    monkeypatch.setattr(mcpHost, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(mcpHost, "SOURCES", {n: tmp_path / f"{n}.json" for n in mcpHost.SOURCES})
+    monkeypatch.setattr(mcpHost, "TRIP_STORE", JsonTripStore(tmp_path / "trips.json"))
+    mcpHost._profile_cache.clear()
+    yield mcpHost
+    mcpHost._profile_cache.clear()
+
+
+def _queries(m, n=600):
+    rng = random.Random(7)
+    cities = sorted({f["sourceCity"] for f in m.FLIGHTS} | {f["destinationCity"] for f in m.FLIGHTS}
+                    | {h["city"] for h in m.HOTELS}) + ["BLR", "Bengaluru", "Dehli", "Mangalore"]
+    dates = sorted({f["departureDate"] for f in m.FLIGHTS})
+    users = [None, None, "U001", "U002", "U999"]
+    qs = []
+    for _ in range(n):
+        qs.append((m.search_flights_tool, {
+            "source": rng.choice(cities), "destination": rng.choice(cities), "date": rng.choice(dates),
+            "nonStop": rng.choice([True, False]), "timeWindow": rng.choice([None, "morning", "evening"]),
+            "sortBy": rng.choice(["price", "duration"]), "limit": rng.choice([1, 3, 12]), "userId": rng.choice(users)}))
+        qs.append((m.search_hotels_tool, {
+            "city": rng.choice(cities), "maxPrice": rng.choice([None, 3000, 3000.0, 4500, 7777]),
+            "minRating": rng.choice([None, 4, 4.0, 4.5, 4.2]), "limit": rng.choice([1, 5, 11]),
+            "userId": rng.choice(users)}))
+        qs.append((m.search_attractions_tool, {"city": rng.choice(cities), "userId": rng.choice(users)}))
+    qs.append((m.search_user_profile_tool, {"userIds": ["U001", "U002", "nope"]}))
+    return qs
+
+
+def _answers(qs):
+    return [json.dumps(tool(dict(p)), sort_keys=True) for tool, p in qs]
+
+
+def test_snapshot_answers_match_json(host):
+    host.build_snapshot()
+    host._load_inventory()
+    assert host.INVENTORY["source"] == "snapshot"
+    assert isinstance(host.FLIGHT_VIEWS, snapshot.MmapIndex)
+    qs = _queries(host)
+    from_snapshot = _answers(qs)
+    host._load_inventory(use_snapshot=False)
+    assert host.INVENTORY["source"] == "json"
+    assert _answers(qs) == from_snapshot
+
+
+def test_mmap_index_lookups(host):
+    host.build_snapshot()
+    host._load_inventory()
+    key = next(iter(host.HOTEL_VIEWS))
+    assert key in host.HOTEL_VIEWS
+    city = key[0]
+    # ints and integral floats name the same view, as they do in a dict
+    assert host.HOTEL_VIEWS[(city, 3000, 4)]["count"] == host.HOTEL_VIEWS[(city, 3000.0, 4.0)]["count"]
+    assert ("nowhere", None, None) not in host.HOTEL_VIEWS
+    assert host.USERS_BY_ID["U001"]["userId"] == "U001"
+    assert "nope" not in host.USERS_BY_ID
+    assert len(list(host.FLIGHTS_BY_ROUTE)) == len(host.FLIGHTS_BY_ROUTE)
+
+
+def test_changed_source_forces_json(host, tmp_path):
+    host.build_snapshot()
+    hotels = json.loads((tmp_path / "hotels.json").read_text(encoding="utf-8"))
+    hotels.append(dict(hotels[0], name="Freshly Added Inn", rating=5.0))
+    (tmp_path / "hotels.json").write_text(json.dumps(hotels), encoding="utf-8")
+    host._load_inventory()
+    assert host.INVENTORY["source"] == "json"
+    names = [h["name"] for h in host.search_hotels_tool({"city": hotels[0]["city"], "limit": 50})["results"]]
+    assert "Freshly Added Inn" in names
+
+
+def test_changed_params_force_json(host, monkeypatch):
+    host.build_snapshot()
+    params = dict(host.SNAPSHOT_PARAMS, timeWindows=dict(host.SNAPSHOT_PARAMS["timeWindows"], morning=["07:00:00", "11:00:00"]))
+    monkeypatch.setattr(host, "SNAPSHOT_PARAMS", params)
+    host._load_inventory()
+    assert host.INVENTORY["source"] == "json"
+
+
+@pytest.mark.parametrize("use_snapshot", [False, True])
+def test_user_budgets_and_ratings_are_served_from_views(host, use_snapshot):
+    if use_snapshot:
+        host.build_snapshot()
+    host._load_inventory(use_snapshot=use_snapshot)
+    prefs = [u["preferences"] for u in json.loads((host.DATA_DIR / "users.json").read_text(encoding="utf-8"))]
+    city = host.HOTELS[0]["city"]
+    before = host.view_stats()["hotels"]["hits"]
+    for p in prefs:
+        host.search_hotels_tool({"city": city, "maxPrice": p["hotelBudgetPerNight"], "minRating": p["minHotelRating"]})
+    # groupAgent: lowest budget, highest rating of the group
+    host.search_hotels_tool({"city": city, "maxPrice": min(p["hotelBudgetPerNight"] for p in prefs),
+                             "minRating": max(p["minHotelRating"] for p in prefs)})
+    assert host.view_stats()["hotels"]["hits"] - before == len(prefs) + 1
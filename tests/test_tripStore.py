@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from tripStore import JsonTripStore, SqliteTripStore
+
+SEED = [
+    {"userId": "U001", "tripId": "T1", "startDate": "2024-03-11"},
+    {"userId": "U001", "tripId": "T2", "startDate": "2023-12-20"},
+    {"userId": "U002", "tripId": "T3", "startDate": "2024-06-02"},
+]
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def store(request, tmp_path):
+    (tmp_path / "trips.json").write_text(json.dumps(SEED), encoding="utf-8")
+    if request.param == "sqlite":
+        s = SqliteTripStore(tmp_path / "trips.db", seed=tmp_path / "trips.json")
+    else:
+        s = JsonTripStore(tmp_path / "trips.json")
+    yield s
+    s.close()
+
+
+def _ids(trips):
+    return [t.get("tripId") or t["meta"]["tag"] for t in trips]
+
+
+def test_planner_itineraries_are_dated_from_flight_or_attractions(store):
+    store.save({"userId": "U001", "meta": {"tag": "flight"},
+                "itinerary": {"flight": {"departureDate": "2025-02-12"}, "attractions": [{"date": "2025-02-13"}]}})
+    store.save({"userId": "U001", "meta": {"tag": "attractions"},
+                "itinerary": {"attractions": [{"date": "2024-05-02"}, {"date": "2024-05-01"}]}})
+    assert _ids(store.trips_for_user("U001")) == ["flight", "attractions", "T1", "T2"]
+    assert _ids(store.trips_for_user("U001", 1)) == ["flight"]
+
+
+def test_undated_trips_come_first_latest_save_first(store):
+    store.save({"userId": "U001", "meta": {"tag": "a"}, "itinerary": {"note": "no dates"}})
+    store.save({"userId": "U001", "meta": {"tag": "b"}, "itinerary": {"note": "no dates"}})
+    assert _ids(store.trips_for_user("U001")) == ["b", "a", "T1", "T2"]
@@ -0,0 +1,234 @@
+"""
+tripStore — persistence backends for saved itineraries (used by mcpHost).
+
+Backends (pick with TRIP_STORE env var):
+  sqlite (default) — mock-data/trips.db, WAL mode, indexed on (userId, startDate).
+                     Saves are queued to a single writer thread that commits
+                     everything that arrived together in ONE transaction, so
+                     concurrent saves share an fsync instead of each rewriting
+                     the whole history.
+  json             — legacy single trips.json file, rewritten on every save
+                     (now at least guarded by a lock and replaced atomically).
+
+Both return the same trip dicts, so mcpHost responses do not change.
+
+The stores also hold export job state (put_job / update_job / get_job, see
+exportJobs). SQLite keeps it in a jobs table written through the same writer
+thread, so any mcpHost worker process can answer a status poll; the json
+backend keeps jobs in memory and therefore needs a single worker process.
+"""
+
+import json, logging, os, queue, sqlite3, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger("tripStore")
+
+JOB_FIELDS = ("userId", "status", "formats", "files", "message", "createdAt", "updatedAt")
+_JSON_JOB_FIELDS = ("formats", "files")
+
+def _start_date(trip: Dict[str,Any]) -> str:
+    # seed trips carry startDate at top level; the planner's itinerary only has
+    # flight.departureDate and attractions[].date, so derive it from those
+    it = trip.get("itinerary") if isinstance(trip.get("itinerary"), dict) else {}
+    for src in (trip, it, trip.get("meta") or {}):
+        if isinstance(src, dict):
+            v = src.get("startDate") or src.get("start_date")
+            if v: return str(v)
+    flight = it.get("flight") if isinstance(it.get("flight"), dict) else {}
+    if flight.get("departureDate"): return str(flight["departureDate"])
+    dates = [str(a["date"]) for a in (it.get("attractions") or it.get("days") or [])
+             if isinstance(a, dict) and a.get("date")]
+    return min(dates) if dates else ""
+
+def _newest_first(trips: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
+    # by start date, newest first; undated trips (saved without any date) lead, latest save first
+    order = sorted(enumerate(trips), key=lambda it: (_start_date(it[1]) == "", _start_date(it[1]), it[0]), reverse=True)
+    return [t for _, t in order]
+
+class JsonTripStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._trips: List[Dict[str,Any]] = []
+        self._jobs: "OrderedDict[str,Dict[str,Any]]" = OrderedDict()
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                d = json.load(f)
+                self._trips = d if isinstance(d, list) else [d]
+
+    def save(self, trip: Dict[str,Any]) -> Dict[str,Any]:
+        with self._lock:
+            self._trips.append(trip)
+            tmp = self.path.with_suffix(".json.tmp")
+            with tmp.open("w", encoding="utf-8") as fh:
+                json.dump(self._trips, fh, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        return trip
+
+    def trips_for_user(self, userId: str, limit: Optional[int] = None) -> List[Dict[str,Any]]:
+        with self._lock:
+            ts = [t for t in self._trips if t.get("userId") == userId]
+        ts = _newest_first(ts)
+        return ts[:limit] if limit else ts
+
+    def put_job(self, job: Dict[str,Any], keep: int = 1000):
+        with self._lock:
+            self._jobs[job["jobId"]] = dict(job)
+            while len(self._jobs) > keep:
+                self._jobs.popitem(last=False)
+
+    def update_job(self, jobId: str, **fields):
+        with self._lock:
+            job = self._jobs.get(jobId)  # may have been evicted
+            if job is not None:
+                job.update(fields, updatedAt=time.time())
+
+    def get_job(self, jobId: str) -> Optional[Dict[str,Any]]:
+        with self._lock:
+            job = self._jobs.get(jobId)
+            return dict(job) if job else None
+
+    def close(self):
+        pass
+
+class SqliteTripStore:
+    _STOP = object()
+
+    def __init__(self, path: Path, seed: Optional[Path] = None, max_batch: int = 256):
+        self.path = Path(path)
+        self.max_batch = max_batch
+        self._local = threading.local()
+        self._queue: "queue.Queue" = queue.Queue()
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS trips (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                userId TEXT NOT NULL,
+                startDate TEXT NOT NULL DEFAULT '',
+                doc TEXT NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_trips_user_start ON trips(userId, startDate)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                jobId TEXT PRIMARY KEY,
+                userId TEXT, status TEXT, formats TEXT, files TEXT, message TEXT,
+                createdAt REAL, updatedAt REAL)""")
+            if seed is not None and conn.execute("SELECT 1 FROM trips LIMIT 1").fetchone() is None:
+                self._seed(conn, Path(seed))
+            self._backfill_start_dates(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        self._writer = threading.Thread(target=self._write_loop, name="tripStore-writer", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def _row(trip: Dict[str,Any]):
+        return (str(trip.get("userId", "")), _start_date(trip), json.dumps(trip, ensure_ascii=False))
+
+    def _seed(self, conn: sqlite3.Connection, seed: Path):
+        if not seed.exists(): return
+        with seed.open("r", encoding="utf-8") as f:
+            d = json.load(f)
+        rows = [self._row(t) for t in (d if isinstance(d, list) else [d]) if isinstance(t, dict)]
+        conn.executemany("INSERT INTO trips(userId, startDate, doc) VALUES (?,?,?)", rows)
+        logger.info(f"Seeded {len(rows)} trips from {seed.name}")
+
+    @staticmethod
+    def _backfill_start_dates(conn: sqlite3.Connection):
+        # rows saved before startDate was derived from the itinerary were stored undated
+        rows = [(_start_date(json.loads(doc)), rid) for rid, doc in
+                conn.execute("SELECT id, doc FROM trips WHERE startDate = ''")]
+        rows = [r for r in rows if r[0]]
+        if rows:
+            conn.executemany("UPDATE trips SET startDate = ? WHERE id = ?", rows)
+            logger.info(f"Backfilled startDate on {len(rows)} trips")
+
+    def _reader(self) -> sqlite3.Connection:
+        # one connection per thread; WAL lets readers run alongside the writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, args: tuple, timeout: float = 10.0):
+        # every write goes through the writer thread (one writer, group commits)
+        fut: Future = Future()
+        self._queue.put(((sql, args), fut))
+        fut.result(timeout=timeout)
+
+    def save(self, trip: Dict[str,Any], timeout: float = 10.0) -> Dict[str,Any]:
+        # serialize in the caller's thread; the writer only does the INSERT + commit
+        self._write("INSERT INTO trips(userId, startDate, doc) VALUES (?,?,?)", self._row(trip), timeout)
+        return trip
+
+    @staticmethod
+    def _job_value(field: str, v):
+        return json.dumps(v, ensure_ascii=False) if field in _JSON_JOB_FIELDS and v is not None else v
+
+    def put_job(self, job: Dict[str,Any], keep: int = 1000):
+        cols = ("jobId",) + JOB_FIELDS
+        self._write(f"INSERT OR REPLACE INTO jobs({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                    tuple(self._job_value(c, job.get(c)) for c in cols))
+        # keep the newest `keep` jobs (rowid grows with every insert)
+        self._write("DELETE FROM jobs WHERE rowid <= (SELECT MAX(rowid) FROM jobs) - ?", (int(keep),))
+
+    def update_job(self, jobId: str, **fields):
+        fields["updatedAt"] = time.time()
+        cols = [c for c in fields if c in JOB_FIELDS]
+        self._write(f"UPDATE jobs SET {', '.join(c + ' = ?' for c in cols)} WHERE jobId = ?",
+                    tuple(self._job_value(c, fields[c]) for c in cols) + (jobId,))
+
+    def get_job(self, jobId: str) -> Optional[Dict[str,Any]]:
+        cur = self._reader().execute(f"SELECT jobId, {', '.join(JOB_FIELDS)} FROM jobs WHERE jobId = ?", (jobId,))
+        row = cur.fetchone()
+        if row is None: return None
+        job = dict(zip(("jobId",) + JOB_FIELDS, row))
+        for c in _JSON_JOB_FIELDS:
+            if job[c] is not None: job[c] = json.loads(job[c])
+        return {k: v for k, v in job.items() if v is not None}
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, one fsync per checkpoint
+        while True:
+            item = self._queue.get()
+            if item is self._STOP: break
+            batch = [item]
+            # group commit: take everything that queued up while we were busy
+            while len(batch) < self.max_batch:
+                try: nxt = self._queue.get_nowait()
+                except queue.Empty: break
+                if nxt is self._STOP:
+                    self._queue.put(nxt)
+                    break
+                batch.append(nxt)
+            try:
+                with conn:
+                    for (sql, args), _ in batch:
+                        conn.execute(sql, args)
+                for _, fut in batch: fut.set_result(True)
+            except Exception as e:
+                logger.exception("trip batch commit failed")
+                for _, fut in batch: fut.set_exception(e)
+        conn.close()
+
+    def trips_for_user(self, userId: str, limit: Optional[int] = None) -> List[Dict[str,Any]]:
+        sql = "SELECT doc FROM trips WHERE userId = ? ORDER BY startDate = '' DESC, startDate DESC, id DESC"
+        args: tuple = (userId,)
+        if limit:
+            sql += " LIMIT ?"; args += (int(limit),)
+        return [json.loads(doc) for (doc,) in self._reader().execute(sql, args)]
+
+    def close(self):
+        self._queue.put(self._STOP)
+        self._writer.join(timeout=5)
+
+def open_trip_store(data_dir: Path):
+    backend = os.getenv("TRIP_STORE", "sqlite").strip().lower()
+    if backend == "json":
+        return JsonTripStore(data_dir / "trips.json")
+    return SqliteTripStore(data_dir / "trips.db", seed=data_dir / "trips.json")